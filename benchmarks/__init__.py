@@ -0,0 +1 @@
+"""Offline benchmarks for the nws_patch forecast transform."""
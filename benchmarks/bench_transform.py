@@ -0,0 +1,234 @@
+"""Benchmark the nws_patch forecast transform against synthetic NWS payloads.
+
+Runs without network access. Each case reports latency percentiles and the
+memory allocated per call, and results can be saved as a baseline and
+compared against later runs:
+
+    python -m benchmarks.bench_transform --save
+    python -m benchmarks.bench_transform --compare
+"""
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import gc
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from benchmarks import payloads
+from custom_components.nws_patch.transform import (
+    PERIOD_START_CACHE,
+    ForecastPeriod,
+    _convert_single_fcast,
+    _merge_fcasts,
+    aggregate_hourly,
+    build_forecast,
+    parse_period_start,
+)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+Case = Callable[[], Callable[[], Any]]
+
+
+def _build(forecast: list[dict[str, Any]]) -> Callable[[], Any]:
+    return lambda: build_forecast(forecast)  # type: ignore[arg-type]
+
+
+def _aggregate(forecast: list[dict[str, Any]]) -> Callable[[], Any]:
+    return lambda: aggregate_hourly(forecast)  # type: ignore[arg-type]
+
+
+def _merge() -> Callable[[], Any]:
+    forecast = payloads.twice_daily()
+    return lambda: _merge_fcasts(
+        [ForecastPeriod(forecast[0]), ForecastPeriod(forecast[1])]  # type: ignore[arg-type]
+    )
+
+
+def _single() -> Callable[[], Any]:
+    forecast = payloads.twice_daily(start_daytime=False)
+    return lambda: _convert_single_fcast(
+        [ForecastPeriod(forecast[0])]  # type: ignore[arg-type]
+    )
+
+
+def _parse() -> Callable[[], Any]:
+    value = payloads.twice_daily()[0]["datetime"]
+    return lambda: parse_period_start(value)
+
+
+def _cached_start() -> Callable[[], Any]:
+    value = payloads.twice_daily()[0]["datetime"]
+    return lambda: PERIOD_START_CACHE.get(value)
+
+
+CASES: dict[str, Case] = {
+    "build_forecast[day_first]": lambda: _build(payloads.twice_daily(True)),
+    "build_forecast[night_first]": lambda: _build(payloads.twice_daily(False)),
+    "build_forecast[hourly]": lambda: _build(payloads.hourly()),
+    "aggregate_hourly": lambda: _aggregate(payloads.hourly()),
+    "merge_fcasts": _merge,
+    "convert_single_fcast": _single,
+    "period_start[parse]": _parse,
+    "period_start[cached]": _cached_start,
+}
+
+
+def measure(func: Callable[[], Any], iterations: int, cold: bool) -> dict[str, float]:
+    """Time func and record how much it allocates per call."""
+
+    for _ in range(min(iterations, 100)):
+        func()
+
+    timings: list[int] = []
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            if cold:
+                PERIOD_START_CACHE.clear()
+            start = time.perf_counter_ns()
+            func()
+            timings.append(time.perf_counter_ns() - start)
+    finally:
+        gc.enable()
+
+    # allocations are measured separately so tracing doesn't skew the timings
+    samples = min(iterations, 200)
+    tracemalloc.start()
+    try:
+        peaks: list[int] = []
+        results = []
+        before = tracemalloc.take_snapshot()
+        for _ in range(samples):
+            if cold:
+                PERIOD_START_CACHE.clear()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            results.append(func())
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    blocks = sum(
+        stat.count_diff
+        for stat in after.compare_to(before, "filename")
+        if stat.count_diff > 0
+    )
+    del results
+
+    quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "iterations": iterations,
+        "p50_us": quantiles[49] / 1000,
+        "p90_us": quantiles[89] / 1000,
+        "p99_us": quantiles[98] / 1000,
+        "mean_us": statistics.fmean(timings) / 1000,
+        "peak_bytes": statistics.median(peaks),
+        "blocks_per_call": blocks / samples,
+    }
+
+
+def run(
+    selected: list[str], iterations: int, cold: bool
+) -> dict[str, dict[str, float]]:
+    """Run the selected cases and return their results keyed by case name."""
+
+    results = {}
+    for name in selected:
+        results[name] = measure(CASES[name](), iterations, cold)
+    return results
+
+
+def report(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None = None,
+) -> None:
+    """Print results, with the p50 change against a baseline if given."""
+
+    header = f"{'case':<32} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} "
+    header += f"{'peak B':>9} {'blocks':>7}"
+    if baseline is not None:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+
+    for name, result in results.items():
+        line = f"{name:<32} {result['p50_us']:>9.2f} {result['p90_us']:>9.2f} "
+        line += f"{result['p99_us']:>9.2f} {result['peak_bytes']:>9.0f} "
+        line += f"{result['blocks_per_call']:>7.1f}"
+        if baseline is not None:
+            if name in baseline:
+                change = result["p50_us"] / baseline[name]["p50_us"] - 1
+                line += f" {change:>+11.1%}"
+            else:
+                line += f" {'new':>12}"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks from the command line."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help="cases to run, default all")
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    parser.add_argument(
+        "--cold", action="store_true", help="clear the timestamp cache every call"
+    )
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        type=Path,
+        help="save results as a baseline",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        type=Path,
+        help="compare results against a saved baseline",
+    )
+    args = parser.parse_args(argv)
+
+    selected = args.cases or list(CASES)
+    unknown = [name for name in selected if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    baseline = None
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+
+    results = run(selected, args.iterations, args.cold)
+    report(results, baseline)
+
+    if args.save is not None:
+        args.save.write_text(
+            json.dumps(
+                {
+                    "python": sys.version.split()[0],
+                    "cold": args.cold,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        print(f"saved baseline to {args.save}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
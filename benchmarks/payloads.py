@@ -0,0 +1,58 @@
+"""Synthetic NWS forecast payloads shaped like the upstream forecast property."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+# fixed start so every run buckets the same way regardless of when it runs
+START = datetime(2022, 12, 5, 6, 0, tzinfo=timezone(timedelta(hours=-6)))
+
+CONDITIONS = ("sunny", "partlycloudy", "cloudy", "rainy", "snowy", "clear-night")
+
+DESCRIPTION = (
+    "Mostly sunny, with a high near {temp}. Southwest wind 5 to 10 mph, with "
+    "gusts as high as 20 mph. Chance of precipitation is {pop}%. New "
+    "precipitation amounts of less than a tenth of an inch possible. "
+)
+
+
+def _period(when: datetime, index: int, daytime: bool) -> dict[str, Any]:
+    temp = 40 + (index * 7) % 25
+    pop = (index * 13) % 100
+    return {
+        "detailed_description": DESCRIPTION.format(temp=temp, pop=pop),
+        "datetime": when.isoformat(),
+        "is_daytime": daytime,
+        "condition": CONDITIONS[index % len(CONDITIONS)],
+        "precipitation_probability": pop,
+        "native_temperature": temp,
+        "native_dew_point": temp - 10,
+        "humidity": 40 + index % 50,
+        "wind_bearing": (index * 45) % 360,
+        "native_wind_speed": 5 + index % 15,
+    }
+
+
+def twice_daily(start_daytime: bool = True, periods: int = 14) -> list[dict[str, Any]]:
+    """Return a twice daily forecast starting with a day or a night period."""
+
+    when = START if start_daytime else START + timedelta(hours=12)
+    daytime = start_daytime
+    forecast = []
+    for index in range(periods):
+        forecast.append(_period(when, index, daytime))
+        when += timedelta(hours=12)
+        daytime = not daytime
+
+    return forecast
+
+
+def hourly(periods: int = 156) -> list[dict[str, Any]]:
+    """Return an hourly forecast covering six and a half days."""
+
+    forecast = []
+    for index in range(periods):
+        when = START + timedelta(hours=index)
+        forecast.append(_period(when, index, 6 <= when.hour < 18))
+
+    return forecast
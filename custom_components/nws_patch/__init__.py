@@ -1,287 +1,982 @@
 """Package definition for nws_patch."""
 from __future__ import annotations
 
-from collections import defaultdict
-from collections.abc import Callable, Coroutine
-from datetime import datetime, timedelta
+import asyncio
+from collections.abc import Callable, Coroutine, Mapping
+from dataclasses import dataclass
 import logging
-from typing import TYPE_CHECKING, Any, TypedDict, cast
-
-from homeassistant.components.weather import (
-    ATTR_FORECAST_IS_DAYTIME,
-    ATTR_FORECAST_NATIVE_TEMP,
-    ATTR_FORECAST_NATIVE_TEMP_LOW,
+import time
+from typing import TYPE_CHECKING, Any, cast
+
+from .const import (
+    ATTR_CALLS,
+    ATTR_DETAILED_FORECAST,
+    ATTR_FORECAST_STALE,
+    ATTR_SECONDS,
+    CONF_DETAILED_FORECAST,
+    CONF_HOURLY_FORECAST,
+    CONF_STALL_THRESHOLD,
+    CONF_TRACE_MAX_CHARS,
+    CONF_TRACE_SAMPLE_RATE,
+    DATA_DETAILED_FORECASTS,
+    DATA_FORECAST_STORE,
+    DATA_SETUP_STARTED,
+    DATA_TIME_TO_PATCH,
+    DATA_UNSUB_NWS_LOADED,
+    DEFAULT_PROFILE_CALLS,
+    DEFAULT_PROFILE_SECONDS,
+    DEFAULT_STALL_THRESHOLD,
+    DEFAULT_TRACE_MAX_CHARS,
+    DEFAULT_TRACE_SAMPLE_RATE,
+    DETAILED_FORECAST_ATTRIBUTE,
+    DETAILED_FORECAST_SENSOR,
+    DETAILED_FORECAST_UNRECORDED,
+    DOMAIN,
+    HOURLY_FORECAST_DAILY,
+    HOURLY_FORECAST_HOURLY,
+    NWS_DOMAIN,
+    PLATFORMS,
+    SERVICE_PROFILE,
+    SIGNAL_DETAILED_FORECAST_UPDATED,
+    SIGNAL_NEW_DETAILED_FORECAST,
+    WEATHER_DOMAIN,
+)
+from .compat import DAYNIGHT, default_time_zone
+from .profiler import PROFILER
+from .cache import CACHE, EntityState, entity_state
+from .stats import CallTimings, PatchStats
+from .store import ForecastStore
+from .trace import TRACE
+from .transform import (
+    NewForecast,
+    NWSForecast,
+    aggregate_hourly,
+    build_forecast,
+    clear_caches,
+    forecast_fingerprint,
 )
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_call_later
-from homeassistant.helpers.typing import ConfigType
-from homeassistant.util.dt import parse_datetime
 
 if TYPE_CHECKING:
     from homeassistant.components.nws.weather import NWSWeather
     from homeassistant.components.weather import WeatherEntity
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, ServiceCall
+    from homeassistant.helpers.entity import DeviceInfo
+    from homeassistant.helpers.typing import ConfigType
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class NWSForecast(TypedDict):
-    """Strong type for incoming NWS forecast data."""
+class ForecastMemo:
+    """Last forecast built for an entity along with what it was built from."""
+
+    __slots__ = ("mode", "source", "fingerprint", "forecast", "stale")
+
+    def __init__(
+        self,
+        mode: str,
+        source: Any,
+        fingerprint: int,
+        forecast: tuple[NewForecast, ...] | tuple[NWSForecast, ...],
+        stale: bool = False,
+    ) -> None:
+        """Create a memo of forecast, built from source in mode."""
+        self.mode = mode
+        self.source = source
+        self.fingerprint = fingerprint
+        self.forecast = forecast
+        self.stale = stale
+
+
+@dataclass(frozen=True, eq=False)
+class _WrittenState:
+    """What the last state write of an entity was built from."""
+
+    __slots__ = ("forecast", "stale", "observation", "available", "registry_entry")
+
+    forecast: tuple[NewForecast, ...] | tuple[NWSForecast, ...] | None
+    stale: bool
+    observation: Any
+    available: bool
+    registry_entry: Any
+
+    def same_as(self, other: _WrittenState | None) -> bool:
+        """Return if other was built from the very same objects."""
+        return (
+            other is not None
+            and self.forecast is other.forecast
+            and self.stale == other.stale
+            and self.observation is other.observation
+            and self.available == other.available
+            and self.registry_entry is other.registry_entry
+        )
+
+
+@dataclass(frozen=True)
+class DetailedForecast:
+    """Latest detailed forecast text of a patched NWS weather entity."""
 
-    detailed_description: str
-    datetime: str
-    daytime: bool
-    native_temperature: float
+    __slots__ = ("name", "device_info", "text")
 
+    name: str | None
+    device_info: DeviceInfo | None
+    text: str
 
-class NewForecast(TypedDict):
-    """Strong type for outgoing modified NWS forecast data."""
 
-    detailed_description: str
-    datetime: str
-    native_temperature: float
-    native_templow: float
+@dataclass
+class PatchOptions:
+    """Options from the config entry that the patched properties read."""
+
+    detailed_forecast: str = DETAILED_FORECAST_ATTRIBUTE
+    hourly_forecast: str = HOURLY_FORECAST_HOURLY
+    stall_threshold: float = DEFAULT_STALL_THRESHOLD / 1000
 
 
 NWS_FORECAST_PROP: Callable[[NWSWeather], Any] | None = None
+# attribute holding the raw list the forecast property reads
+NWS_FORECAST_ATTR = "_forecast"
 NWS_STATE_ATTRIBUTE_PROP: Callable[[WeatherEntity], Any] | None = None
+NWS_WRITE_STATE_PROP: Callable[[WeatherEntity], None] | None = None
+NWS_FORECAST_TWICE_DAILY: Callable[
+    [NWSWeather], Coroutine[Any, Any, list[NWSForecast] | None]
+] | None = None
 
+# EntityState attributes holding the memo for the legacy property and coroutine paths
+_MEMO_ATTR = "memo"
+_TWICE_DAILY_MEMO_ATTR = "twice_daily_memo"
 
-async def async_setup(hass: HomeAssistant, config: ConfigType, tries: int = 1) -> bool:
-    """Extract original properties to allow install/uninstall without restarting."""
+OPTIONS = PatchOptions()
+STATS = PatchStats()
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Note when setup started so the time until the patch lands can be reported."""
+
+    del config  # config is not used
 
     _LOGGER.info("Getting ready to patch NWSWeather")
+    hass.data.setdefault(DOMAIN, {})[DATA_SETUP_STARTED] = time.monotonic()
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Patch NWSWeather as soon as the nws integration has loaded."""
+
+    _async_apply_options(hass, entry)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+    entry.async_on_unload(_async_listen_time_zone(hass))
+
+    data = hass.data.setdefault(DOMAIN, {})
+    if DATA_FORECAST_STORE not in data:
+        store = ForecastStore(hass)
+        await store.async_load()
+        data[DATA_FORECAST_STORE] = store
+    data[DATA_UNSUB_NWS_LOADED] = _async_when_nws_loaded(hass, _async_patch_nws)
+
+    _async_register_services(hass)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    return True
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the profile service."""
+
+    import voluptuous as vol  # pylint: disable=import-outside-toplevel
+
+    from homeassistant.exceptions import (  # pylint: disable=import-outside-toplevel
+        HomeAssistantError,
+    )
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the patched NWS code for a number of calls or seconds."""
+
+        try:
+            done = PROFILER.start(call.data[ATTR_CALLS])
+        except RuntimeError as err:
+            raise HomeAssistantError(str(err)) from err
+
+        try:
+            await asyncio.wait_for(done.wait(), call.data[ATTR_SECONDS])
+        except asyncio.TimeoutError:
+            pass
+
+        calls = PROFILER.profiled
+        if (profile := PROFILER.stop()) is None:
+            _LOGGER.warning("No patched NWS calls ran while profiling")
+            return
+
+        path = hass.config.path(f"{DOMAIN}_profile_{int(time.time())}.prof")
+        await hass.async_add_executor_job(profile.dump_stats, path)
+        _LOGGER.warning("Wrote profile of %d patched NWS calls to %s", calls, path)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=vol.Schema(
+            {
+                vol.Optional(ATTR_CALLS, default=DEFAULT_PROFILE_CALLS): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
+                vol.Optional(ATTR_SECONDS, default=DEFAULT_PROFILE_SECONDS): vol.All(
+                    vol.Coerce(float), vol.Range(min=1)
+                ),
+            }
+        ),
+    )
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the patch."""
+
+    _async_apply_options(hass, entry)
+    _async_rebuild_forecasts()
+
+
+def _async_listen_time_zone(hass: HomeAssistant) -> CALLBACK_TYPE:
+    """Rebuild the forecasts when the configured time zone changes."""
+
+    from homeassistant.const import (  # pylint: disable=import-outside-toplevel
+        EVENT_CORE_CONFIG_UPDATE,
+    )
+    from homeassistant.core import (  # pylint: disable=import-outside-toplevel
+        callback,
+    )
+
+    @callback
+    def is_time_zone(event: Event | Mapping[str, Any]) -> bool:
+        # newer versions pass the filter the event data rather than the event
+        return "time_zone" in getattr(event, "data", event)
+
+    @callback
+    def time_zone_updated(event: Event) -> None:
+        del event
+        _async_rebuild_forecasts()
+
+    return hass.bus.async_listen(
+        EVENT_CORE_CONFIG_UPDATE, time_zone_updated, event_filter=is_time_zone
+    )
+
+
+def _async_rebuild_forecasts() -> None:
+    """Rebuild the forecast of every patched entity and write its state."""
+
+    # the memos and the last write were built under the old settings, and the
+    # upstream data has not changed, so nothing else would rebuild them
+    CACHE.invalidate()
+    for entity, _ in CACHE.items():
+        if entity.hass is not None:
+            entity.async_write_ha_state()
+
+
+def _async_apply_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Copy the entry options to where the patched properties can read them."""
+
+    OPTIONS.detailed_forecast = entry.options.get(
+        CONF_DETAILED_FORECAST, DETAILED_FORECAST_ATTRIBUTE
+    )
+    OPTIONS.hourly_forecast = entry.options.get(
+        CONF_HOURLY_FORECAST, HOURLY_FORECAST_HOURLY
+    )
+    OPTIONS.stall_threshold = (
+        entry.options.get(CONF_STALL_THRESHOLD, DEFAULT_STALL_THRESHOLD) / 1000
+    )
+    TRACE.configure(
+        entry.options.get(CONF_TRACE_SAMPLE_RATE, DEFAULT_TRACE_SAMPLE_RATE),
+        entry.options.get(CONF_TRACE_MAX_CHARS, DEFAULT_TRACE_MAX_CHARS),
+    )
+    _async_exclude_from_recorder(
+        hass, OPTIONS.detailed_forecast == DETAILED_FORECAST_UNRECORDED
+    )
+
+
+def _async_exclude_from_recorder(hass: HomeAssistant, exclude: bool) -> None:
+    """Add or remove detailed_forecast from the recorder's excluded attributes.
+
+    The recorder keeps excluded attributes per entity domain, and newer versions
+    also per integration, so both weather and nws are updated. The sets are
+    replaced rather than changed in place as the recorder thread reads them.
+    """
+
     try:
-        from homeassistant.components.nws.weather import (  # pylint: disable=import-outside-toplevel
-            NWSWeather,
+        from homeassistant.components.recorder.const import (  # pylint: disable=import-outside-toplevel
+            EXCLUDE_ATTRIBUTES,
         )
-    except ModuleNotFoundError:
-        await retry_setup(hass, config, tries, async_setup)
-        return True
+    except ImportError:
+        return
+
+    if (excludes := hass.data.get(EXCLUDE_ATTRIBUTES)) is None:
+        if exclude:
+            _LOGGER.warning(
+                "Recorder is not loaded, detailed_forecast stays recorded"
+            )
+        return
+
+    for domain in (WEATHER_DOMAIN, NWS_DOMAIN):
+        attributes = set(excludes.get(domain, ()))
+        if exclude:
+            attributes.add(ATTR_DETAILED_FORECAST)
+        else:
+            attributes.discard(ATTR_DETAILED_FORECAST)
+        excludes[domain] = attributes
+
+
+def _async_when_nws_loaded(
+    hass: HomeAssistant, action: Callable[[HomeAssistant], None]
+) -> CALLBACK_TYPE | None:
+    """Run action once nws has loaded, returning a cancel callback if waiting."""
+
+    from homeassistant.const import (  # pylint: disable=import-outside-toplevel
+        ATTR_COMPONENT,
+        EVENT_COMPONENT_LOADED,
+    )
+    from homeassistant.core import (  # pylint: disable=import-outside-toplevel
+        callback,
+    )
+
+    if NWS_DOMAIN in hass.config.components:
+        action(hass)
+        return None
+
+    _LOGGER.info("Waiting for the nws integration to load")
+
+    @callback
+    def is_nws(event: Event | Mapping[str, Any]) -> bool:
+        # newer versions pass the filter the event data rather than the event
+        data = getattr(event, "data", event)
+        return bool(data.get(ATTR_COMPONENT) == NWS_DOMAIN)
+
+    @callback
+    def nws_loaded(event: Event) -> None:
+        del event
+        unsub()
+        hass.data.get(DOMAIN, {}).pop(DATA_UNSUB_NWS_LOADED, None)
+        action(hass)
+
+    unsub = hass.bus.async_listen(
+        EVENT_COMPONENT_LOADED, nws_loaded, event_filter=is_nws
+    )
+    return unsub
+
+
+def _capture_original_props(nws_weather: type[NWSWeather]) -> bool:
+    """Extract original properties to allow install/uninstall without restarting."""
 
     # only copy out the props if we haven't prior, preventing a potential mixup
+    # gone from versions serving forecasts only through the subscription API
     global NWS_FORECAST_PROP  # pylint: disable=global-statement
     if NWS_FORECAST_PROP is None:
-        NWS_FORECAST_PROP = NWSWeather.forecast
+        NWS_FORECAST_PROP = getattr(nws_weather, "forecast", None)
 
     global NWS_STATE_ATTRIBUTE_PROP  # pylint: disable=global-statement
     if NWS_STATE_ATTRIBUTE_PROP is None:
-        NWS_STATE_ATTRIBUTE_PROP = NWSWeather.state_attributes
+        NWS_STATE_ATTRIBUTE_PROP = nws_weather.state_attributes
+
+    global NWS_WRITE_STATE_PROP  # pylint: disable=global-statement
+    if NWS_WRITE_STATE_PROP is None:
+        NWS_WRITE_STATE_PROP = nws_weather.async_write_ha_state
+
+    # versions with the subscription API turned _forecast into the method
+    # converting the raw list, which moved to _forecast_legacy
+    global NWS_FORECAST_ATTR  # pylint: disable=global-statement
+    NWS_FORECAST_ATTR = (
+        "_forecast_legacy"
+        if callable(getattr(nws_weather, "_forecast", None))
+        else "_forecast"
+    )
+
+    # only present on versions serving forecasts through the subscription API
+    global NWS_FORECAST_TWICE_DAILY  # pylint: disable=global-statement
+    if NWS_FORECAST_TWICE_DAILY is None:
+        NWS_FORECAST_TWICE_DAILY = getattr(
+            nws_weather, "async_forecast_twice_daily", None
+        )
 
-    return NWS_FORECAST_PROP is not None and NWS_STATE_ATTRIBUTE_PROP is not None
+    return (
+        NWS_STATE_ATTRIBUTE_PROP is not None
+        and NWS_WRITE_STATE_PROP is not None
+        and (NWS_FORECAST_PROP is not None or NWS_FORECAST_TWICE_DAILY is not None)
+    )
 
 
-async def async_setup_entry(
-    hass: HomeAssistant, config: ConfigType, tries: int = 1
-) -> bool:
+def _async_patch_nws(hass: HomeAssistant) -> None:
     """Patch the NWS forecast and state_attributes functions."""
 
+    from homeassistant.core import (  # pylint: disable=import-outside-toplevel
+        callback,
+    )
+
     try:
-        from homeassistant.components.nws.const import (  # pylint: disable=hass-component-root-import,import-outside-toplevel
-            DAYNIGHT,
-        )
         from homeassistant.components.nws.weather import (  # pylint: disable=import-outside-toplevel
             NWSWeather,
         )
-    except ModuleNotFoundError:
-        await retry_setup(hass, config, tries, async_setup_entry)
-        return True
+    except ImportError:
+        _LOGGER.exception("Unable to patch nws component as NWSWeather is missing")
+        return
+
+    if not _capture_original_props(NWSWeather):
+        _LOGGER.error(
+            "Unable to patch nws component as the original props are missing"
+        )
+        return
 
     class NWSWrap(NWSWeather):
         """Simple "class" to make typing a new property on the original class easier."""
 
         detailed_forecast: property
 
-    def set_detailed_forecast(self: NWSWrap, forecast: str) -> None:
-        _LOGGER.debug("setting detailed forecast: %s", forecast)
-        setattr(self, "_detailed_forecast", forecast)
-
     def get_detailed_forecast(self: NWSWrap) -> str:
-        _LOGGER.debug("getting detailed forecast")
-        forecast = getattr(self, "_detailed_forecast", "")
-        _LOGGER.debug(forecast)
-        return forecast
+        state = CACHE.peek(self)
+        return state.snapshot.detailed_forecast if state is not None else ""
 
     cast(  # pylint: disable=assignment-from-no-return
-        NWSWrap, NWSForecast
-    ).detailed_forecast = property(  # pylint: disable=too-many-function-args
-        get_detailed_forecast
-    ).setter(
-        set_detailed_forecast
-    )
+        type[NWSWrap], NWSWeather
+    ).detailed_forecast = property(get_detailed_forecast)
     _LOGGER.debug("added detailed forecast property")
 
-    def daily_forecast(self: NWSWrap) -> list[NewForecast] | list[NWSForecast] | None:
-        """Convert the normal forecast to a daily forecast."""
+    def publish_forecast(
+        self: NWSWrap,
+        memo_attr: str,
+        mode: str,
+        source: Any,
+        orig_forecast: list[NWSForecast] | None,
+    ) -> ForecastMemo | None:
+        """Publish the forecast built from orig_forecast, reusing equal results."""
+
+        # if there is no original forecast, e.g. right after a restart, keep
+        # showing the last one built, marked stale, or failing that whatever
+        # was stored before the restart
+        state = entity_state(self)
+        own_mode = mode == getattr(self, "mode", DAYNIGHT)
+        if not orig_forecast:
+            memo = getattr(state, memo_attr)
+            if memo is None or memo.mode != mode:
+                (memo, description) = _stale_memo(self, mode)
+            elif memo.stale or not memo.forecast:
+                return memo
+            else:
+                memo = ForecastMemo(mode, None, 0, memo.forecast, stale=True)
+                description = state.snapshot.detailed_forecast
+            setattr(state, memo_attr, memo)
+            if own_mode:
+                _publish_snapshot(self, state, memo, description)
+            CACHE.account(state)
+            return memo
+
+        # new raw data with the same content as last time, keep the old result
+        time_zone = default_time_zone()
+        fingerprint = hash(
+            (
+                forecast_fingerprint(orig_forecast),
+                time_zone,
+                OPTIONS.hourly_forecast,
+            )
+        )
+        memo: ForecastMemo | None = getattr(state, memo_attr)
+        if memo is not None and memo.mode == mode and memo.fingerprint == fingerprint:
+            STATS.transforms_skipped += 1
+            state.stats.cache_hits += 1
+            # the published forecast is unchanged, only its source is new
+            memo = ForecastMemo(mode, source, fingerprint, memo.forecast)
+            setattr(state, memo_attr, memo)
+            return memo
+
+        STATS.transforms += 1
+        stats = state.stats
+        stats.cache_misses += 1
+        start = time.perf_counter()
+
+        # if this is not the DAYNIGHT forecast publish it unaltered, unless it
+        # should be collapsed into days.
+        description = ""
+        if mode != DAYNIGHT and OPTIONS.hourly_forecast == HOURLY_FORECAST_DAILY:
+            memo = ForecastMemo(
+                mode, source, fingerprint, aggregate_hourly(orig_forecast, time_zone)
+            )
+        elif mode != DAYNIGHT:
+            if TRACE.enabled:
+                TRACE.record("forecast.passthrough", entity=self.entity_id, mode=mode)
+            memo = ForecastMemo(mode, source, fingerprint, tuple(orig_forecast))
+        else:
+            (forecast, description) = build_forecast(orig_forecast, time_zone)
+            memo = ForecastMemo(mode, source, fingerprint, forecast)
+
+        stats.transform.record(time.perf_counter() - start)
+        setattr(state, memo_attr, memo)
+        if own_mode:
+            _publish_snapshot(self, state, memo, description)
+        CACHE.account(state)
+        _async_store_forecast(self, memo, description)
+        return memo
+
+    def refresh_forecast(self: NWSWrap) -> ForecastMemo | None:
+        """Rebuild the forecast if the upstream NWS data has changed."""
+
+        # without the legacy property the forecast is only built when
+        # async_forecast_twice_daily is called
+        if NWS_FORECAST_PROP is None:
+            return None
 
-        _LOGGER.debug("running for mode %s", self.mode)
+        source = getattr(self, NWS_FORECAST_ATTR, None)
+        memo = _unchanged_memo(self, _MEMO_ATTR, self.mode, source)
+        if memo is not None:
+            return memo
 
-        if NWS_FORECAST_PROP is None:
-            _LOGGER.error("NWS forecast property has gone missing! :(")
-            return cast(list[NWSForecast], [])
+        if TRACE.enabled:
+            TRACE.record("forecast.refresh", entity=self.entity_id, mode=self.mode)
 
-        # get the original forecast, and if none return none
         orig_forecast: list[
             NWSForecast
         ] | None = NWS_FORECAST_PROP.__get__(  # pylint: disable=unnecessary-dunder-call
             self
         )
-        if not orig_forecast:
+        return publish_forecast(self, _MEMO_ATTR, self.mode, source, orig_forecast)
+
+    def daily_forecast(
+        self: NWSWrap,
+    ) -> tuple[NewForecast, ...] | tuple[NWSForecast, ...] | None:
+        """Return the daily forecast built during the last update."""
+
+        if PROFILER.active:
+            return PROFILER.run(timed_daily_forecast, self)
+        return timed_daily_forecast(self)
+
+    def timed_daily_forecast(
+        self: NWSWrap,
+    ) -> tuple[NewForecast, ...] | tuple[NWSForecast, ...] | None:
+        start = time.perf_counter()
+        try:
+            state = CACHE.peek(self)
+            if state is not None and state.ticking:
+                memo = state.tick
+            else:
+                memo = refresh_forecast(self)
+                state = CACHE.peek(self)
+            if memo is None or state is None:
+                return None
+            return state.snapshot.forecast or None
+        finally:
+            if (state := CACHE.peek(self)) is not None:
+                _record_call(self, state.stats.forecast, "forecast", start)
+
+    if NWS_FORECAST_PROP is not None:
+        _LOGGER.info("Patching forecast")
+        NWSWeather.forecast = property(daily_forecast)  # type: ignore[assignment]
+
+    @callback
+    def write_state_with_forecast(self: NWSWrap) -> None:
+        """Build the forecast once when NWS pushes an update, then write state."""
+
+        if PROFILER.active:
+            PROFILER.run(timed_write_state, self)
+        else:
+            timed_write_state(self)
+
+    def timed_write_state(self: NWSWrap) -> None:
+        # the forecast is rebuilt here, so this is where a slow merge shows up
+        start = time.perf_counter()
+        try:
+            write_state(self)
+        finally:
+            if (state := CACHE.peek(self)) is not None:
+                _record_call(
+                    self, state.stats.write_state, "async_write_ha_state", start
+                )
+
+    def write_state(self: NWSWrap) -> None:
+        memo = refresh_forecast(self)
+
+        # skip the write when neither the forecast nor anything else NWS pushes
+        # has changed since the last one, e.g. an identical forecast poll
+        written = _WrittenState(
+            None if memo is None else memo.forecast,
+            memo is not None and memo.stale,
+            getattr(self, "observation", None),
+            self.available,
+            getattr(self, "registry_entry", None),
+        )
+        state = entity_state(self)
+        if memo is not None and written.same_as(state.written):
+            STATS.writes_skipped += 1
+            return
+
+        state.written = written
+        if NWS_WRITE_STATE_PROP is not None:
+            # the getters the write calls read this memo rather than refreshing
+            state.start_tick(memo)
+            try:
+                NWS_WRITE_STATE_PROP(self)
+            finally:
+                state.end_tick()
+
+    _LOGGER.info("Patching async_write_ha_state")
+    NWSWeather.async_write_ha_state = write_state_with_forecast  # type: ignore[assignment]
+
+    async def forecast_twice_daily(
+        self: NWSWrap,
+    ) -> tuple[NewForecast, ...] | None:
+        """Return the merged twice daily forecast, built once per NWS update."""
+
+        if NWS_FORECAST_TWICE_DAILY is None:
+            _LOGGER.error("NWS twice daily forecast has gone missing! :(")
             return None
 
-        # if this is not the DAYNIGHT forecast return it unaltered.
-        if self.mode != DAYNIGHT:
-            _LOGGER.debug("returning original forecast for mode %s", self.mode)
-            return orig_forecast
-
-        bucket: dict[datetime, list[NWSForecast]] = defaultdict(list)
-        for item in orig_forecast:
-            date = parse_datetime(item["datetime"])
-            if not date:
-                continue
-
-            date = date.replace(hour=0, minute=0, second=0, microsecond=0)
-            bucket[date].append(item)
-
-        _LOGGER.debug("buckets: %s", bucket)
-
-        forecast: list[NewForecast] = []
-        tomorrow = False
-        for day, fcasts in bucket.items():
-            _LOGGER.debug("bucket: %s: %d", day, len(fcasts))
-            if len(fcasts) == 1:
-                tomorrow = True
-                single_fcast = _convert_single_fcast(fcasts)
-                forecast.append(single_fcast)
-            elif len(fcasts) >= 2:
-                new_fcast = _merge_fcasts(fcasts)
-                if new_fcast:
-                    forecast.append(new_fcast)
-                else:
-                    _LOGGER.warning(
-                        "Day %s is unable to merge multiple forecasts: %s", day, fcasts
-                    )
+        source = getattr(self, "_forecast_twice_daily", None)
+        memo = _unchanged_memo(self, _TWICE_DAILY_MEMO_ATTR, DAYNIGHT, source)
+        if memo is None:
+            orig_forecast = await NWS_FORECAST_TWICE_DAILY(self)
+            if PROFILER.active:
+                memo = PROFILER.run(publish_twice_daily, self, source, orig_forecast)
             else:
-                _LOGGER.warning("Day %s has no forecasts: %s", day, fcasts)
+                memo = publish_twice_daily(self, source, orig_forecast)
 
-        (first, second) = ("Tonight", "Tomorrow") if tomorrow else ("Today", "Tonight")
-        description = f"### {first}\n"
-        description += f"{orig_forecast[0]['detailed_description']}\n"
-        description += f"### {second}\n"
-        description += f"{orig_forecast[1]['detailed_description']}"
-
-        self.detailed_forecast = description
-
-        _LOGGER.debug("new forecast: %s", forecast)
-        return forecast
-
-    _LOGGER.info("Patching forecast")
-    NWSWeather.forecast = property(daily_forecast)  # type: ignore[assignment]
+        if memo is None:
+            return None
+        # a day/night entity shows this forecast, so serve its published one
+        forecast = memo.forecast
+        if self.mode == DAYNIGHT and (state := CACHE.peek(self)) is not None:
+            forecast = state.snapshot.forecast
+        return cast(tuple[NewForecast, ...], forecast) if forecast else None
+
+    def publish_twice_daily(
+        self: NWSWrap, source: Any, orig_forecast: list[NWSForecast] | None
+    ) -> ForecastMemo | None:
+        start = time.perf_counter()
+        try:
+            return publish_forecast(
+                self, _TWICE_DAILY_MEMO_ATTR, DAYNIGHT, source, orig_forecast
+            )
+        finally:
+            if (state := CACHE.peek(self)) is not None:
+                _record_call(
+                    self,
+                    state.stats.forecast_twice_daily,
+                    "async_forecast_twice_daily",
+                    start,
+                    "_forecast_twice_daily",
+                )
+
+    if NWS_FORECAST_TWICE_DAILY is not None:
+        _LOGGER.info("Patching async_forecast_twice_daily")
+        NWSWeather.async_forecast_twice_daily = forecast_twice_daily  # type: ignore[assignment]
 
     def add_detailed_description_state(self: NWSWrap) -> dict[str, Any]:
+        if PROFILER.active:
+            return PROFILER.run(timed_detailed_description_state, self)
+        return timed_detailed_description_state(self)
+
+    def timed_detailed_description_state(self: NWSWrap) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return detailed_description_state(self)
+        finally:
+            if (state := CACHE.peek(self)) is not None:
+                _record_call(
+                    self, state.stats.state_attributes, "state_attributes", start
+                )
+
+    def detailed_description_state(self: NWSWrap) -> dict[str, Any]:
         if NWS_STATE_ATTRIBUTE_PROP is None:
             _LOGGER.error("NWS state attribute prop has gone missing :(")
             return {}
 
+        # outside of a state write refresh once up front, so the forecast and
+        # detailed forecast below come from the same memo whatever reads first
+        cached = CACHE.peek(self)
+        if cached is not None and cached.ticking:
+            return add_detailed_forecast(self, cached.tick)
+
+        memo = refresh_forecast(self)
+        if (cached := CACHE.peek(self)) is None:
+            return add_detailed_forecast(self, memo)
+
+        cached.start_tick(memo)
+        try:
+            return add_detailed_forecast(self, cached.tick)
+        finally:
+            cached.end_tick()
+
+    def add_detailed_forecast(
+        self: NWSWrap, memo: ForecastMemo | None
+    ) -> dict[str, Any]:
         state: dict[
             str, Any
         ] = NWS_STATE_ATTRIBUTE_PROP.__get__(  # pylint: disable=unnecessary-dunder-call
             self
         )
 
-        if self.mode == DAYNIGHT:
-            state["detailed_forecast"] = self.detailed_forecast
+        if (
+            self.mode == DAYNIGHT
+            and OPTIONS.detailed_forecast != DETAILED_FORECAST_SENSOR
+        ):
+            state[ATTR_DETAILED_FORECAST] = self.detailed_forecast
+
+        if memo is not None and memo.stale:
+            state[ATTR_FORECAST_STALE] = True
 
         return state
 
     _LOGGER.info("Patching state_attributes")
     NWSWeather.state_attributes = property(add_detailed_description_state)  # type: ignore[assignment, misc]
 
-    _LOGGER.info("NWSWeather patched :3")
+    data = hass.data.setdefault(DOMAIN, {})
+    if (started := data.get(DATA_SETUP_STARTED)) is not None:
+        data[DATA_TIME_TO_PATCH] = time.monotonic() - started
+        _LOGGER.info(
+            "NWSWeather patched %.3fs after setup :3", data[DATA_TIME_TO_PATCH]
+        )
+    else:
+        _LOGGER.info("NWSWeather patched :3")
 
-    return True
+    _async_write_nws_entities(hass, NWSWeather)
 
 
-async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    """Restore original NWS forecast behavior on removal."""
+def _async_write_nws_entities(
+    hass: HomeAssistant, nws_weather: type[NWSWeather]
+) -> None:
+    """Write the state of the NWS entities added before the patch went live."""
 
-    # remove unused required parameters
-    del hass
-    del config_entry
+    # until NWS next pushes an update their state still lacks the merged
+    # forecast and the detailed forecast
+    from homeassistant.helpers.entity_platform import (  # pylint: disable=import-outside-toplevel
+        async_get_platforms,
+    )
 
-    _LOGGER.info("Removing nws forecast patch")
+    for platform in async_get_platforms(hass, NWS_DOMAIN):
+        for entity in list(platform.entities.values()):
+            if isinstance(entity, nws_weather) and entity.hass is not None:
+                entity.async_write_ha_state()
+
+
+def patch_state() -> dict[str, bool]:
+    """Return whether the original props were captured and the patches are live."""
+
+    try:
+        from homeassistant.components.nws.weather import (  # pylint: disable=import-outside-toplevel
+            NWSWeather,
+        )
+    except ImportError:
+        return {"nws_loaded": False}
+
+    def live(name: str, original: Any) -> bool:
+        current = getattr(NWSWeather, name, None)
+        return original is not None and current not in (None, original)
+
+    return {
+        "nws_loaded": True,
+        "forecast_prop_captured": NWS_FORECAST_PROP is not None,
+        "state_attribute_prop_captured": NWS_STATE_ATTRIBUTE_PROP is not None,
+        "forecast_patched": live("forecast", NWS_FORECAST_PROP),
+        "state_attributes_patched": live("state_attributes", NWS_STATE_ATTRIBUTE_PROP),
+        "write_state_patched": live("async_write_ha_state", NWS_WRITE_STATE_PROP),
+        "forecast_twice_daily_patched": live(
+            "async_forecast_twice_daily", NWS_FORECAST_TWICE_DAILY
+        ),
+    }
+
+
+def _record_call(
+    entity: NWSWeather,
+    timings: CallTimings,
+    name: str,
+    start: float,
+    source_attr: str | None = None,
+) -> None:
+    """Record a patched call that started at start, warning if it stalled."""
+
+    elapsed = time.perf_counter() - start
+    timings.record(elapsed)
+    if OPTIONS.stall_threshold and elapsed >= OPTIONS.stall_threshold:
+        timings.stalls += 1
+        _LOGGER.warning(
+            "Patched %s of %s blocked the event loop for %.1f ms with %d forecast"
+            " periods",
+            name,
+            entity.entity_id,
+            elapsed * 1000,
+            len(getattr(entity, source_attr or NWS_FORECAST_ATTR, None) or ()),
+        )
+
+
+def _unchanged_memo(
+    entity: NWSWeather, memo_attr: str, mode: str, source: Any
+) -> ForecastMemo | None:
+    """Return the entity's memo if it was built from this exact upstream data."""
 
-    from homeassistant.components.nws.weather import (  # pylint: disable=import-outside-toplevel
-        NWSWeather,
+    # NWS replaces the raw forecast list wholesale on every update, so if it is
+    # still the same object nothing has changed since the last build.
+    if (state := CACHE.peek(entity)) is None:
+        return None
+    memo: ForecastMemo | None = getattr(state, memo_attr)
+    if (
+        memo is not None
+        and source is not None
+        and memo.source is source
+        and memo.mode == mode
+    ):
+        state.stats.cache_hits += 1
+        return memo
+    return None
+
+
+def _forecast_store(
+    entity: NWSWeather, mode: str
+) -> tuple[ForecastStore, str] | None:
+    """Return the forecast store and the key the mode of entity is stored under."""
+
+    if entity.hass is None or (key := entity.unique_id or entity.entity_id) is None:
+        return None
+    store: ForecastStore | None = entity.hass.data.get(DOMAIN, {}).get(
+        DATA_FORECAST_STORE
     )
+    # the twice daily forecast of an hourly entity is stored next to its own
+    return None if store is None else (store, f"{key}:{mode}")
+
+
+def _stale_memo(entity: NWSWeather, mode: str) -> tuple[ForecastMemo, str]:
+    """Return the forecast and text entity last published, marked stale.
+
+    If nothing usable was stored the memo has an empty forecast, so the store
+    is not looked up again until upstream sends a forecast.
+    """
+
+    nothing = (ForecastMemo(mode, None, 0, ()), "")
+    if (found := _forecast_store(entity, mode)) is None:
+        return nothing
+
+    (store, key) = found
+    stored = store.get(key)
+    # the hourly forecast option only changes what hourly entities publish
+    if (
+        stored is None
+        or stored.mode != mode
+        or (mode != DAYNIGHT and stored.hourly_forecast != OPTIONS.hourly_forecast)
+    ):
+        return nothing
+
+    memo = ForecastMemo(
+        mode,
+        None,
+        0,
+        stored.forecast,  # type: ignore[arg-type]
+        stale=True,
+    )
+    return (memo, stored.detailed_forecast)
 
-    NWSWeather.forecast = NWS_FORECAST_PROP  # type: ignore[assignment]
-    NWSWeather.state_attributes = NWS_STATE_ATTRIBUTE_PROP  # type: ignore[assignment, misc]
 
-    _LOGGER.info("Removed nws forecast path :c")
+def _publish_snapshot(
+    entity: NWSWeather, state: EntityState, memo: ForecastMemo | None, text: str
+) -> None:
+    """Publish what entity now shows, telling the sensors if the text changed."""
+
+    previous = state.publish(
+        () if memo is None else memo.forecast,
+        text,
+        memo is not None and memo.stale,
+    )
+    if text != previous.detailed_forecast:
+        if TRACE.enabled:
+            TRACE.record("detailed_forecast.set", entity=entity.entity_id, text=text)
+        if text:
+            _async_publish_detailed_forecast(entity, text)
 
 
-async def retry_setup(
-    hass: HomeAssistant,
-    config: ConfigType,
-    tries: int,
-    callback: Callable[[HomeAssistant, ConfigType, int], Coroutine[Any, Any, bool]],
+def _async_store_forecast(
+    entity: NWSWeather, memo: ForecastMemo, detailed_forecast: str
 ) -> None:
-    """Schedule a callback every second for three mintues in HA."""
+    """Save a newly built forecast so it can be shown right after a restart."""
 
-    if tries > 180:
-        _LOGGER.error(
-            "Unable to patch nws component as pynws is not available after %d tries",
-            tries - 1,
-        )
+    if (found := _forecast_store(entity, memo.mode)) is None:
         return
 
-    tries = tries + 1
-    _LOGGER.info("Package pynws not installed yet. scheduling try %d", tries)
+    (store, key) = found
+    store.async_update(
+        key,
+        memo.mode,
+        OPTIONS.hourly_forecast,
+        memo.forecast,  # type: ignore[arg-type]
+        detailed_forecast,
+    )
 
-    async def call_again(date: datetime) -> None:
-        del date
-        await callback(hass, config, tries)
 
-    async_call_later(hass, timedelta(seconds=1), call_again)
+def _async_publish_detailed_forecast(entity: NWSWeather, text: str) -> None:
+    """Hand changed detailed forecast text to the detailed forecast sensors."""
 
+    from homeassistant.helpers.dispatcher import (  # pylint: disable=import-outside-toplevel
+        async_dispatcher_send,
+    )
 
-def _merge_fcasts(fcasts: list[NWSForecast]) -> NewForecast | None:
-    try:
-        daycast = max(
-            (f for f in fcasts if f[ATTR_FORECAST_IS_DAYTIME]), key=lambda item: item[ATTR_FORECAST_IS_DAYTIME]
-        )
-        nightcast = max(
-            (f for f in fcasts if not f[ATTR_FORECAST_IS_DAYTIME]), key=lambda item: item[ATTR_FORECAST_IS_DAYTIME]
-        )
-    except ValueError:
-        return None
+    hass = entity.hass
+    if hass is None or (key := entity.unique_id or entity.entity_id) is None:
+        return
 
-    description = "### Day\n"
-    description += daycast["detailed_description"].strip()
-    description += "\n\n### Night\n"
-    description += nightcast["detailed_description"].strip()
+    forecasts: dict[str, DetailedForecast] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_DETAILED_FORECASTS, {})
+    is_new = key not in forecasts
+    forecasts[key] = DetailedForecast(entity.name, entity.device_info, text)
 
-    merged = {**daycast}
-    merged["detailed_description"] = description
-    merged[ATTR_FORECAST_NATIVE_TEMP_LOW] = nightcast[ATTR_FORECAST_NATIVE_TEMP]
+    if is_new:
+        async_dispatcher_send(hass, SIGNAL_NEW_DETAILED_FORECAST, key)
+    else:
+        async_dispatcher_send(hass, SIGNAL_DETAILED_FORECAST_UPDATED.format(key))
 
-    return cast(NewForecast, merged)
 
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Undo the patch and release everything it holds."""
 
-def _convert_single_fcast(fcasts: list[NWSForecast]) -> NewForecast:
-    title = "Day"
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
 
-    new_cast = {**fcasts[0]}
+    data = hass.data.get(DOMAIN, {})
+    if (unsub := data.pop(DATA_UNSUB_NWS_LOADED, None)) is not None:
+        unsub()
 
-    if not new_cast[ATTR_FORECAST_IS_DAYTIME]:
-        title = "Night"
-        new_cast[ATTR_FORECAST_NATIVE_TEMP_LOW] = new_cast[ATTR_FORECAST_NATIVE_TEMP]
-        del new_cast[ATTR_FORECAST_NATIVE_TEMP]
+    _async_restore_nws()
 
-    description = f"### {title}\n"
-    description += cast(NWSForecast, new_cast)["detailed_description"].strip()
-    new_cast["detailed_description"] = description
-    del new_cast[ATTR_FORECAST_IS_DAYTIME]
+    hass.services.async_remove(DOMAIN, SERVICE_PROFILE)
+    PROFILER.stop()
+    TRACE.configure(0)
+    _async_exclude_from_recorder(hass, False)
 
-    return cast(NewForecast, new_cast)
+    data.pop(DATA_DETAILED_FORECASTS, None)
+    CACHE.clear()
+    clear_caches()
+    return True
+
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Restore original NWS forecast behavior and forget the saved forecasts."""
+
+    del config_entry  # config_entry is not used
+
+    _LOGGER.info("Removing nws forecast patch")
+    _async_restore_nws()
+
+    data = hass.data.get(DOMAIN, {})
+    if (store := data.pop(DATA_FORECAST_STORE, None)) is not None:
+        await store.async_remove()
+
+
+def _async_restore_nws() -> None:
+    """Put the original NWSWeather properties back if they were patched."""
+
+    try:
+        from homeassistant.components.nws.weather import (  # pylint: disable=import-outside-toplevel
+            NWSWeather,
+        )
+    except ImportError:
+        return
+
+    if NWS_FORECAST_PROP is not None:
+        NWSWeather.forecast = NWS_FORECAST_PROP  # type: ignore[assignment]
+    if NWS_STATE_ATTRIBUTE_PROP is not None:
+        NWSWeather.state_attributes = NWS_STATE_ATTRIBUTE_PROP  # type: ignore[assignment, misc]
+    if NWS_WRITE_STATE_PROP is not None:
+        NWSWeather.async_write_ha_state = NWS_WRITE_STATE_PROP  # type: ignore[assignment]
+    if NWS_FORECAST_TWICE_DAILY is not None:
+        NWSWeather.async_forecast_twice_daily = NWS_FORECAST_TWICE_DAILY  # type: ignore[assignment]
+    if "detailed_forecast" in vars(NWSWeather):
+        del NWSWeather.detailed_forecast  # type: ignore[attr-defined]
+
+    _LOGGER.info("Removed nws forecast path :c")
@@ -0,0 +1,235 @@
+"""Per-entity state of the patch, held by weak references to the entities.
+
+Nothing is stored on the NWS entities themselves. Each entity maps weakly to
+an EntityState, so entities removed by a reload take their state with them,
+and the forecasts cached for all entities share one memory budget. When the
+budget is exceeded the least recently used entities drop the forecasts they
+cache but do not show, e.g. the twice daily forecast of an hourly entity;
+those are rebuilt the next time they are asked for. The forecast an entity
+shows stays, so evicting never forces a rebuild on the next read.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from weakref import ref
+
+from .stats import EntityStats
+
+if TYPE_CHECKING:
+    from . import ForecastMemo, _WrittenState
+
+# bytes of forecast and detailed forecast text kept for all entities
+CACHE_BUDGET = 2 * 1024 * 1024
+
+# rough JSON bytes of a forecast entry besides its detailed description
+_ENTRY_OVERHEAD = 250
+
+
+def estimate_size(forecast: Iterable[Mapping[str, Any]]) -> int:
+    """Estimate the bytes of forecast as JSON without encoding it."""
+    return sum(
+        _ENTRY_OVERHEAD + len(item.get("detailed_description") or "")
+        for item in forecast
+    )
+
+
+@dataclass(frozen=True)
+class ForecastSnapshot:
+    """Forecast and detailed text an entity shows, replaced whole on changes.
+
+    Publishing swaps the snapshot reference in one assignment, so a reader on
+    any thread sees either the old or the new snapshot, never a mix.
+    """
+
+    __slots__ = ("forecast", "detailed_forecast", "version", "stale")
+
+    forecast: tuple[Mapping[str, Any], ...]
+    detailed_forecast: str
+    version: int
+    stale: bool
+
+
+EMPTY_SNAPSHOT = ForecastSnapshot((), "", 0, False)
+
+
+class EntityState:
+    """Cached forecasts, last write and stats of one patched entity."""
+
+    __slots__ = (
+        "memo",
+        "twice_daily_memo",
+        "written",
+        "tick",
+        "ticking",
+        "snapshot",
+        "stats",
+        "nbytes",
+    )
+
+    def __init__(self) -> None:
+        """Create empty state."""
+        self.memo: ForecastMemo | None = None
+        self.twice_daily_memo: ForecastMemo | None = None
+        self.written: _WrittenState | None = None
+        self.tick: ForecastMemo | None = None
+        self.ticking = False
+        self.snapshot = EMPTY_SNAPSHOT
+        self.stats = EntityStats()
+        self.nbytes = 0
+
+    def start_tick(self, memo: ForecastMemo | None) -> None:
+        """Have the getters serve memo until end_tick, e.g. for one state write."""
+        self.tick = memo
+        self.ticking = True
+
+    def end_tick(self) -> None:
+        """Let the getters refresh the forecast again."""
+        self.tick = None
+        self.ticking = False
+
+    def publish(
+        self,
+        forecast: tuple[Mapping[str, Any], ...],
+        detailed_forecast: str,
+        stale: bool,
+    ) -> ForecastSnapshot:
+        """Replace the snapshot with a new version, returning the previous one."""
+        previous = self.snapshot
+        self.snapshot = ForecastSnapshot(
+            forecast, detailed_forecast, previous.version + 1, stale
+        )
+        return previous
+
+    def measure(self) -> int:
+        """Return the bytes held by the snapshot and the cached forecasts."""
+        nbytes = len(self.snapshot.detailed_forecast)
+        counted: list[tuple[Mapping[str, Any], ...]] = []
+        for forecast in (
+            self.snapshot.forecast,
+            *(
+                memo.forecast
+                for memo in (self.memo, self.twice_daily_memo)
+                if memo is not None
+            ),
+        ):
+            # the memos share their forecast with the snapshot they published
+            if not any(forecast is other for other in counted):
+                counted.append(forecast)
+                nbytes += estimate_size(forecast)
+        return nbytes
+
+    def evictable(self) -> bool:
+        """Return if a cached forecast is held that the snapshot does not show."""
+        shown = self.snapshot.forecast
+        return any(
+            memo is not None and memo.forecast is not shown
+            for memo in (self.memo, self.twice_daily_memo)
+        )
+
+    def evict(self) -> None:
+        """Drop the cached forecasts the snapshot does not show."""
+        shown = self.snapshot.forecast
+        if self.memo is not None and self.memo.forecast is not shown:
+            # the last write references the forecast as well
+            self.memo = None
+            self.written = None
+        if (
+            self.twice_daily_memo is not None
+            and self.twice_daily_memo.forecast is not shown
+        ):
+            self.twice_daily_memo = None
+
+    def invalidate(self) -> None:
+        """Drop all cached forecasts, keeping the snapshot and stats."""
+        self.memo = None
+        self.twice_daily_memo = None
+        self.written = None
+
+
+class EntityCache:
+    """LRU registry of EntityState keyed by weak references to entities."""
+
+    __slots__ = ("budget", "nbytes", "evictions", "_entries")
+
+    def __init__(self, budget: int = CACHE_BUDGET) -> None:
+        """Create an empty registry holding up to budget bytes."""
+        self.budget = budget
+        self.nbytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[ref[Any], EntityState] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of live entities."""
+        return len(self._entries)
+
+    def get(self, entity: Any) -> EntityState:
+        """Return the state of entity, creating it on first use."""
+        key = ref(entity)
+        if (state := self._entries.get(key)) is None:
+            state = self._entries[ref(entity, self._remove)] = EntityState()
+        else:
+            self._entries.move_to_end(key)
+        return state
+
+    def peek(self, entity: Any) -> EntityState | None:
+        """Return the state of entity without marking it as recently used."""
+        return self._entries.get(ref(entity))
+
+    def items(self) -> Iterator[tuple[Any, EntityState]]:
+        """Iterate over the live entities and their state."""
+        for key, state in list(self._entries.items()):
+            if (entity := key()) is not None:
+                yield entity, state
+
+    def account(self, state: EntityState) -> None:
+        """Update the size of state, evicting other entities over the budget."""
+        self._measure(state)
+
+        for other in list(self._entries.values()):
+            if self.nbytes <= self.budget:
+                break
+            if other is state or not other.evictable():
+                continue
+            other.evict()
+            self._measure(other)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop the cached forecasts of every entity so they are rebuilt."""
+        for state in self._entries.values():
+            state.invalidate()
+            self._measure(state)
+
+    def clear(self) -> None:
+        """Forget all entities."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the registry size for diagnostics."""
+        return {
+            "live_entries": len(self._entries),
+            "bytes": self.nbytes,
+            "budget": self.budget,
+            "evictions": self.evictions,
+        }
+
+    def _measure(self, state: EntityState) -> None:
+        nbytes = state.measure()
+        self.nbytes += nbytes - state.nbytes
+        state.nbytes = nbytes
+
+    def _remove(self, key: ref[Any]) -> None:
+        if (state := self._entries.pop(key, None)) is not None:
+            self.nbytes -= state.nbytes
+
+
+CACHE = EntityCache()
+
+
+def entity_state(entity: Any) -> EntityState:
+    """Return the state of entity, creating it on first use."""
+    return CACHE.get(entity)
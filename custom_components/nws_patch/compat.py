@@ -0,0 +1,70 @@
+"""Home Assistant symbols used by the transform, with stand-ins when HA is absent.
+
+The stand-ins mirror the Home Assistant values so the transform behaves the
+same when it is imported on its own for benchmarks or fuzzing.
+"""
+from __future__ import annotations
+
+from datetime import datetime, tzinfo
+from typing import Final
+
+try:
+    from homeassistant.components.weather import (
+        ATTR_FORECAST_CONDITION,
+        ATTR_FORECAST_IS_DAYTIME,
+        ATTR_FORECAST_NATIVE_TEMP,
+        ATTR_FORECAST_NATIVE_TEMP_LOW,
+        ATTR_FORECAST_PRECIPITATION_PROBABILITY,
+        ATTR_FORECAST_TIME,
+    )
+except ImportError:
+    ATTR_FORECAST_CONDITION: Final = "condition"  # type: ignore[misc]
+    ATTR_FORECAST_IS_DAYTIME: Final = "is_daytime"  # type: ignore[misc]
+    ATTR_FORECAST_NATIVE_TEMP: Final = "native_temperature"  # type: ignore[misc]
+    ATTR_FORECAST_NATIVE_TEMP_LOW: Final = "native_templow"  # type: ignore[misc]
+    ATTR_FORECAST_PRECIPITATION_PROBABILITY: Final = (  # type: ignore[misc]
+        "precipitation_probability"
+    )
+    ATTR_FORECAST_TIME: Final = "datetime"  # type: ignore[misc]
+
+try:
+    from homeassistant.util.dt import parse_datetime
+except ImportError:
+
+    def parse_datetime(dt_str: str) -> datetime | None:  # type: ignore[misc]
+        """Parse an ISO 8601 string, returning None if it is not valid."""
+        try:
+            return datetime.fromisoformat(dt_str)
+        except ValueError:
+            return None
+
+
+try:
+    from homeassistant.util import dt as dt_util
+
+    def default_time_zone() -> tzinfo | None:
+        """Return the time zone Home Assistant is configured for."""
+        return dt_util.DEFAULT_TIME_ZONE
+
+except ImportError:
+
+    def default_time_zone() -> tzinfo | None:
+        """Return None so periods keep the offset NWS sent."""
+        return None
+
+
+# mirrors homeassistant.components.nws.const.DAYNIGHT, importing that pulls in the
+# nws package and pynws, which may not be installed yet
+DAYNIGHT: Final = "daynight"
+
+__all__ = [
+    "ATTR_FORECAST_CONDITION",
+    "ATTR_FORECAST_IS_DAYTIME",
+    "ATTR_FORECAST_NATIVE_TEMP",
+    "ATTR_FORECAST_NATIVE_TEMP_LOW",
+    "ATTR_FORECAST_PRECIPITATION_PROBABILITY",
+    "ATTR_FORECAST_TIME",
+    "DAYNIGHT",
+    "default_time_zone",
+    "parse_datetime",
+]
@@ -3,11 +3,30 @@ from __future__ import annotations
 
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
+from .const import (
+    CONF_DETAILED_FORECAST,
+    CONF_HOURLY_FORECAST,
+    CONF_STALL_THRESHOLD,
+    CONF_TRACE_MAX_CHARS,
+    CONF_TRACE_SAMPLE_RATE,
+    DEFAULT_STALL_THRESHOLD,
+    DEFAULT_TRACE_MAX_CHARS,
+    DEFAULT_TRACE_SAMPLE_RATE,
+    DETAILED_FORECAST_ATTRIBUTE,
+    DETAILED_FORECAST_MODES,
+    DOMAIN,
+    HOURLY_FORECAST_HOURLY,
+    HOURLY_FORECAST_MODES,
+)
+
 
-class NWSPatchConfigFlow(config_entries.ConfigFlow, domain="nws_patch"):
+class NWSPatchConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Provide super basic config flow."""
 
     async def async_step_user(
@@ -16,7 +35,69 @@ class NWSPatchConfigFlow(config_entries.ConfigFlow, domain="nws_patch"):
         """Run user step, registering our entity automatically."""
         del user_input  # user_input is not used
 
-        await self.async_set_unique_id("nws_patch")
+        await self.async_set_unique_id(DOMAIN)
         self._abort_if_unique_id_configured()
 
         return self.async_create_entry(title="Patched NWS Forecast", data={})
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return NWSPatchOptionsFlow(config_entry)
+
+
+class NWSPatchOptionsFlow(config_entries.OptionsFlow):
+    """Let the patch behavior be tuned after setup."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Keep the entry so the current options can be shown."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show and save the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_DETAILED_FORECAST,
+                        default=options.get(
+                            CONF_DETAILED_FORECAST, DETAILED_FORECAST_ATTRIBUTE
+                        ),
+                    ): vol.In(DETAILED_FORECAST_MODES),
+                    vol.Required(
+                        CONF_HOURLY_FORECAST,
+                        default=options.get(
+                            CONF_HOURLY_FORECAST, HOURLY_FORECAST_HOURLY
+                        ),
+                    ): vol.In(HOURLY_FORECAST_MODES),
+                    vol.Required(
+                        CONF_STALL_THRESHOLD,
+                        default=options.get(
+                            CONF_STALL_THRESHOLD, DEFAULT_STALL_THRESHOLD
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_TRACE_SAMPLE_RATE,
+                        default=options.get(
+                            CONF_TRACE_SAMPLE_RATE, DEFAULT_TRACE_SAMPLE_RATE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+                    vol.Required(
+                        CONF_TRACE_MAX_CHARS,
+                        default=options.get(
+                            CONF_TRACE_MAX_CHARS, DEFAULT_TRACE_MAX_CHARS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=20)),
+                }
+            ),
+        )
@@ -0,0 +1,58 @@
+"""Constants for nws_patch."""
+from __future__ import annotations
+
+from typing import Final
+
+DOMAIN: Final = "nws_patch"
+NWS_DOMAIN: Final = "nws"
+
+# keys into hass.data[DOMAIN]
+DATA_SETUP_STARTED: Final = "setup_started"
+DATA_TIME_TO_PATCH: Final = "time_to_patch"
+DATA_UNSUB_NWS_LOADED: Final = "unsub_nws_loaded"
+DATA_DETAILED_FORECASTS: Final = "detailed_forecasts"
+DATA_FORECAST_STORE: Final = "forecast_store"
+
+PLATFORMS: Final = ["sensor"]
+
+# dispatcher signals for the detailed forecast sensors
+SIGNAL_NEW_DETAILED_FORECAST: Final = f"{DOMAIN}_new_detailed_forecast"
+SIGNAL_DETAILED_FORECAST_UPDATED: Final = f"{DOMAIN}_detailed_forecast_updated_{{}}"
+
+WEATHER_DOMAIN: Final = "weather"
+ATTR_DETAILED_FORECAST: Final = "detailed_forecast"
+ATTR_FORECAST_STALE: Final = "forecast_stale"
+
+# how the weather entity carries the detailed forecast text
+CONF_DETAILED_FORECAST: Final = "detailed_forecast"
+DETAILED_FORECAST_ATTRIBUTE: Final = "attribute"
+DETAILED_FORECAST_UNRECORDED: Final = "unrecorded"
+DETAILED_FORECAST_SENSOR: Final = "sensor"
+DETAILED_FORECAST_MODES: Final = (
+    DETAILED_FORECAST_ATTRIBUTE,
+    DETAILED_FORECAST_UNRECORDED,
+    DETAILED_FORECAST_SENSOR,
+)
+
+# what the hourly weather entity's forecast shows
+CONF_HOURLY_FORECAST: Final = "hourly_forecast"
+HOURLY_FORECAST_HOURLY: Final = "hourly"
+HOURLY_FORECAST_DAILY: Final = "daily"
+HOURLY_FORECAST_MODES: Final = (HOURLY_FORECAST_HOURLY, HOURLY_FORECAST_DAILY)
+
+# patched calls taking at least this many milliseconds are logged as stalls
+CONF_STALL_THRESHOLD: Final = "stall_threshold"
+DEFAULT_STALL_THRESHOLD: Final = 50.0
+
+# share of trace records logged at debug level, and how much of each value
+CONF_TRACE_SAMPLE_RATE: Final = "trace_sample_rate"
+CONF_TRACE_MAX_CHARS: Final = "trace_max_chars"
+DEFAULT_TRACE_SAMPLE_RATE: Final = 0.0
+DEFAULT_TRACE_MAX_CHARS: Final = 500
+
+# profile the patched entry points for a bounded number of calls or seconds
+SERVICE_PROFILE: Final = "profile"
+ATTR_CALLS: Final = "calls"
+ATTR_SECONDS: Final = "seconds"
+DEFAULT_PROFILE_CALLS: Final = 100
+DEFAULT_PROFILE_SECONDS: Final = 60
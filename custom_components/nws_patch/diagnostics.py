@@ -0,0 +1,55 @@
+"""Diagnostics support for nws_patch."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import _MEMO_ATTR, _TWICE_DAILY_MEMO_ATTR, STATS, ForecastMemo, patch_state
+from .const import DATA_TIME_TO_PATCH, DOMAIN
+from .cache import CACHE, EntityState, estimate_size
+from .transform import PERIOD_START_CACHE
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return how the patch is doing for the config entry."""
+
+    return {
+        "options": dict(entry.options),
+        "time_to_patch": hass.data.get(DOMAIN, {}).get(DATA_TIME_TO_PATCH),
+        "patch": patch_state(),
+        "stats": {
+            "transforms": STATS.transforms,
+            "transforms_skipped": STATS.transforms_skipped,
+            "writes_skipped": STATS.writes_skipped,
+        },
+        "period_start_cache": {
+            "size": len(PERIOD_START_CACHE),
+            "maxsize": PERIOD_START_CACHE.maxsize,
+            "hits": PERIOD_START_CACHE.hits,
+            "misses": PERIOD_START_CACHE.misses,
+        },
+        "entity_cache": CACHE.as_dict(),
+        "entities": {
+            entity.entity_id: _entity_diagnostics(state)
+            for entity, state in CACHE.items()
+        },
+    }
+
+
+def _entity_diagnostics(state: EntityState) -> dict[str, Any]:
+    """Return timings, cache counters and output sizes of one entity."""
+
+    result = state.stats.as_dict()
+    memos = (("forecast", _MEMO_ATTR), ("twice_daily", _TWICE_DAILY_MEMO_ATTR))
+    for name, attr in memos:
+        memo: ForecastMemo | None = getattr(state, attr)
+        if memo is not None:
+            result[f"{name}_entries"] = len(memo.forecast)
+            result[f"{name}_bytes"] = estimate_size(memo.forecast)
+    result["snapshot_version"] = state.snapshot.version
+    result["detailed_forecast_chars"] = len(state.snapshot.detailed_forecast)
+    return result
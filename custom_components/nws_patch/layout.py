@@ -0,0 +1,91 @@
+"""Layouts of the detailed forecast markdown, compiled once.
+
+A layout is written as a format string such as ``"### Day\\n{description}"``.
+Compiling it splits it into interned constant fragments around its fields,
+so rendering is a single join of those fragments and the period text.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from string import Formatter
+import sys
+
+
+class Template:
+    """A format string compiled into fragments joined around its values."""
+
+    __slots__ = ("source", "fields", "render")
+
+    def __init__(self, source: str, fields: tuple[str, ...]) -> None:
+        """Compile source, which has to use exactly fields, in that order."""
+        literals: list[str] = []
+        found: list[str] = []
+        pending = ""
+        for literal, field, spec, conversion in Formatter().parse(source):
+            pending += literal
+            if field is None:
+                continue
+            if spec or conversion:
+                raise ValueError(f"layout {source!r} can not format {field!r}")
+            literals.append(sys.intern(pending))
+            found.append(field)
+            pending = ""
+        literals.append(sys.intern(pending))
+
+        if tuple(found) != fields:
+            raise ValueError(f"layout {source!r} has to use {fields} in that order")
+
+        self.source = source
+        self.fields = fields
+        self.render: Callable[..., str] = _renderer(literals)
+
+    def __repr__(self) -> str:
+        """Return the source the template was compiled from."""
+        return f"Template({self.source!r})"
+
+
+def _renderer(literals: list[str]) -> Callable[..., str]:
+    if len(literals) == 2:
+        (head, tail) = literals
+        return lambda value: "".join((head, value, tail))
+    if len(literals) == 3:
+        (head, middle, tail) = literals
+        return lambda first, second: "".join((head, first, middle, second, tail))
+
+    def render(*values: str) -> str:
+        parts = [literals[0]]
+        for value, literal in zip(values, literals[1:]):
+            parts.append(value)
+            parts.append(literal)
+        return "".join(parts)
+
+    return render
+
+
+class DescriptionLayout:
+    """Compiled layouts of the detailed descriptions build_forecast writes.
+
+    merged is a day with both periods, day and night a day with only one,
+    and today and tonight the summary of the first two periods depending on
+    whether the forecast starts with a day or a night period.
+    """
+
+    __slots__ = ("merged", "day", "night", "today", "tonight")
+
+    def __init__(
+        self,
+        merged: str = "### Day\n{day}\n\n### Night\n{night}",
+        day: str = "### Day\n{description}",
+        night: str = "### Night\n{description}",
+        today: str = "### Today\n{first}\n### Tonight\n{second}",
+        tonight: str = "### Tonight\n{first}\n### Tomorrow\n{second}",
+    ) -> None:
+        """Compile the layouts, raising ValueError if one uses the wrong fields."""
+        self.merged = Template(merged, ("day", "night"))
+        self.day = Template(day, ("description",))
+        self.night = Template(night, ("description",))
+        self.today = Template(today, ("first", "second"))
+        self.tonight = Template(tonight, ("first", "second"))
+
+
+DEFAULT_LAYOUT = DescriptionLayout()
@@ -0,0 +1,81 @@
+"""Bounded cProfile windows over the patched NWS code paths."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import cProfile
+import logging
+from typing import Any, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class ProfileWindow:
+    """Profile the next calls of the patched entry points.
+
+    Only the outermost patched call turns the profiler on, so the nested
+    transform functions (_merge_fcasts, _convert_single_fcast, ...) show up
+    inside it rather than being counted as calls of their own.
+    """
+
+    __slots__ = ("active", "remaining", "profiled", "_depth", "_profile", "_done")
+
+    def __init__(self) -> None:
+        """Create an idle window."""
+        self.active = False
+        self.remaining = 0
+        self.profiled = 0
+        self._depth = 0
+        self._profile: cProfile.Profile | None = None
+        self._done: asyncio.Event | None = None
+
+    def start(self, calls: int) -> asyncio.Event:
+        """Profile up to calls calls, returning an event set once they ran."""
+        if self.active:
+            raise RuntimeError("a profile is already running")
+        self.active = True
+        self.remaining = calls
+        self.profiled = 0
+        self._profile = cProfile.Profile()
+        self._done = asyncio.Event()
+        return self._done
+
+    def run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Call func, profiling it if this is an outermost call in the window."""
+        profile = self._profile
+        if self._depth or profile is None or self.remaining <= 0:
+            return func(*args)
+
+        self._depth += 1
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is already hooked into the interpreter
+            _LOGGER.warning("Unable to profile, another profiler is active")
+            self._depth -= 1
+            self.stop()
+            return func(*args)
+
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            self._depth -= 1
+            self.remaining -= 1
+            self.profiled += 1
+            if self.remaining <= 0 and self._done is not None:
+                self._done.set()
+
+    def stop(self) -> cProfile.Profile | None:
+        """End the window, returning the profile if any calls were profiled."""
+        profile, self._profile = self._profile, None
+        self.active = False
+        if self._done is not None:
+            self._done.set()
+            self._done = None
+        return profile if self.profiled else None
+
+
+PROFILER = ProfileWindow()
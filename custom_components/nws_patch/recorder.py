@@ -0,0 +1,13 @@
+"""Integration platform for recorder."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import ATTR_DETAILED_FORECAST
+
+
+@callback
+def exclude_attributes(hass: HomeAssistant) -> set[str]:
+    """Exclude the detailed forecast text from being recorded in the database."""
+    del hass  # hass is not used
+    return {ATTR_DETAILED_FORECAST}
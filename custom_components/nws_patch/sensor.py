@@ -0,0 +1,85 @@
+"""Detailed forecast sensors for patched NWS weather entities."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import DetailedForecast
+from .const import (
+    ATTR_DETAILED_FORECAST,
+    DATA_DETAILED_FORECASTS,
+    DOMAIN,
+    SIGNAL_DETAILED_FORECAST_UPDATED,
+    SIGNAL_NEW_DETAILED_FORECAST,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Add a sensor for every NWS weather entity with a detailed forecast."""
+
+    forecasts: dict[str, DetailedForecast] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_DETAILED_FORECASTS, {})
+
+    @callback
+    def add_sensor(key: str) -> None:
+        async_add_entities([NWSDetailedForecastSensor(forecasts, key)])
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_NEW_DETAILED_FORECAST, add_sensor)
+    )
+    async_add_entities(
+        NWSDetailedForecastSensor(forecasts, key) for key in list(forecasts)
+    )
+
+
+class NWSDetailedForecastSensor(SensorEntity):
+    """Today/tonight detailed forecast text of an NWS weather entity.
+
+    The state is the heading of the first period and the full text is kept in
+    an attribute that the recorder excludes.
+    """
+
+    _attr_icon = "mdi:text-box-outline"
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({ATTR_DETAILED_FORECAST})
+
+    def __init__(self, forecasts: dict[str, DetailedForecast], key: str) -> None:
+        """Create the sensor for the weather entity identified by key."""
+        self._forecasts = forecasts
+        self._key = key
+
+        forecast = forecasts[key]
+        self._attr_unique_id = f"{key}_{ATTR_DETAILED_FORECAST}"
+        self._attr_name = f"{forecast.name or key} Detailed Forecast"
+        self._attr_device_info = forecast.device_info
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the heading of the first period, e.g. Today or Tonight."""
+        if (forecast := self._forecasts.get(self._key)) is None or not forecast.text:
+            return None
+        return forecast.text.partition("\n")[0].lstrip("# ")
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the full detailed forecast text."""
+        forecast = self._forecasts.get(self._key)
+        return {ATTR_DETAILED_FORECAST: forecast.text if forecast else None}
+
+    async def async_added_to_hass(self) -> None:
+        """Write state whenever the detailed forecast text changes."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_DETAILED_FORECAST_UPDATED.format(self._key),
+                self.async_write_ha_state,
+            )
+        )
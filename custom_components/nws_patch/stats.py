@@ -0,0 +1,92 @@
+"""Counters and timings of the patched NWS code paths."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+# how many of the latest calls the percentiles are taken over
+TIMING_SAMPLES = 256
+
+# upper bounds in milliseconds of the duration histogram buckets
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+
+@dataclass
+class PatchStats:
+    """Counters of work the patch did and skipped."""
+
+    transforms: int = 0
+    transforms_skipped: int = 0
+    writes_skipped: int = 0
+
+
+class CallTimings:
+    """Call count and a rolling window of durations for one patched function."""
+
+    __slots__ = ("calls", "stalls", "samples")
+
+    def __init__(self, size: int = TIMING_SAMPLES) -> None:
+        """Create empty timings keeping the latest size durations."""
+        self.calls = 0
+        self.stalls = 0
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        """Record one call that took seconds."""
+        self.calls += 1
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the duration below which fraction of the recent calls fall."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def histogram(self) -> dict[str, int]:
+        """Return how many of the recent calls fall in each duration bucket."""
+        counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        for seconds in self.samples:
+            counts[bisect_left(HISTOGRAM_BOUNDS_MS, seconds * 1000)] += 1
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS]
+        labels.append(f">{HISTOGRAM_BOUNDS_MS[-1]}ms")
+        return dict(zip(labels, counts))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timings in milliseconds for diagnostics."""
+        p50 = self.percentile(0.5)
+        p99 = self.percentile(0.99)
+        return {
+            "calls": self.calls,
+            "stalls": self.stalls,
+            "p50_ms": None if p50 is None else round(p50 * 1000, 3),
+            "p99_ms": None if p99 is None else round(p99 * 1000, 3),
+            "histogram": self.histogram(),
+        }
+
+
+@dataclass
+class EntityStats:
+    """Timings and cache counters for one patched NWS weather entity."""
+
+    forecast: CallTimings = field(default_factory=CallTimings)
+    state_attributes: CallTimings = field(default_factory=CallTimings)
+    forecast_twice_daily: CallTimings = field(default_factory=CallTimings)
+    write_state: CallTimings = field(default_factory=CallTimings)
+    transform: CallTimings = field(default_factory=CallTimings)
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats for diagnostics."""
+        return {
+            "daily_forecast": self.forecast.as_dict(),
+            "add_detailed_description_state": self.state_attributes.as_dict(),
+            "async_forecast_twice_daily": self.forecast_twice_daily.as_dict(),
+            "async_write_ha_state": self.write_state.as_dict(),
+            "transform": self.transform.as_dict(),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
@@ -0,0 +1,106 @@
+"""Last built forecasts of the patched entities, kept across restarts."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.forecasts"
+
+# seconds to wait for more updates before writing the store
+SAVE_DELAY = 30
+
+
+@dataclass(frozen=True)
+class StoredForecast:
+    """Forecast and detailed text an entity published before a restart."""
+
+    __slots__ = ("mode", "hourly_forecast", "forecast", "detailed_forecast", "updated")
+
+    mode: str
+    hourly_forecast: str
+    forecast: tuple[Mapping[str, Any], ...]
+    detailed_forecast: str
+    updated: str
+
+
+class ForecastStore:
+    """Keep the latest forecast of every patched entity in HA storage."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Create the store; async_load has to be awaited before use."""
+
+        from homeassistant.helpers.storage import (  # pylint: disable=import-outside-toplevel
+            Store,
+        )
+
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: dict[str, dict[str, Any]] = {}
+        self._forecasts: dict[str, StoredForecast] = {}
+
+    async def async_load(self) -> None:
+        """Load the forecasts saved before the last restart."""
+
+        data = await self._store.async_load()
+        if not isinstance(data, dict):
+            return
+
+        self._data = data
+        for key, item in data.items():
+            try:
+                self._forecasts[key] = StoredForecast(
+                    item["mode"],
+                    item["hourly_forecast"],
+                    tuple(MappingProxyType(fcast) for fcast in item["forecast"]),
+                    item["detailed_forecast"],
+                    item["updated"],
+                )
+            except (KeyError, TypeError):
+                continue
+
+    def get(self, key: str) -> StoredForecast | None:
+        """Return what key last published, if anything."""
+        return self._forecasts.get(key)
+
+    def async_update(
+        self,
+        key: str,
+        mode: str,
+        hourly_forecast: str,
+        forecast: tuple[Mapping[str, Any], ...],
+        detailed_forecast: str,
+    ) -> None:
+        """Remember the newly built forecast of key and schedule a save."""
+
+        updated = datetime.now(timezone.utc).isoformat()
+        self._data[key] = {
+            "mode": mode,
+            "hourly_forecast": hourly_forecast,
+            "forecast": forecast,
+            "detailed_forecast": detailed_forecast,
+            "updated": updated,
+        }
+        self._forecasts[key] = StoredForecast(
+            mode, hourly_forecast, forecast, detailed_forecast, updated
+        )
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the saved forecasts."""
+        self._data = {}
+        self._forecasts = {}
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        return {
+            key: {**item, "forecast": [dict(fcast) for fcast in item["forecast"]]}
+            for key, item in self._data.items()
+        }
@@ -0,0 +1,59 @@
+"""Sampled trace records for the patched NWS code paths.
+
+Tracing replaces logging whole forecasts on every call. Callers guard each
+record with ``if TRACE.enabled:`` so a disabled tracer costs one attribute
+check, and an enabled one only formats the sampled records, truncating each
+value to a fixed size.
+"""
+from __future__ import annotations
+
+import logging
+import random
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHARS = 500
+
+
+class Tracer:
+    """Emit a sample of structured trace records as debug log lines."""
+
+    __slots__ = ("enabled", "sample_rate", "max_chars", "_random")
+
+    def __init__(self) -> None:
+        """Create a disabled tracer."""
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.max_chars = DEFAULT_MAX_CHARS
+        self._random = random.Random()
+
+    def configure(
+        self, sample_rate: float, max_chars: int = DEFAULT_MAX_CHARS
+    ) -> None:
+        """Trace sample_rate of the records, truncating values to max_chars."""
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.max_chars = max_chars
+        self.enabled = self.sample_rate > 0
+
+    def record(self, event: str, **fields: Any) -> None:
+        """Log event with its fields if it is sampled and debug logging is on."""
+        if self.sample_rate < 1 and self._random.random() >= self.sample_rate:
+            return
+        if not _LOGGER.isEnabledFor(logging.DEBUG):
+            return
+
+        _LOGGER.debug(
+            "%s %s",
+            event,
+            " ".join(f"{key}={self._truncate(value)}" for key, value in fields.items()),
+        )
+
+    def _truncate(self, value: Any) -> str:
+        text = value if isinstance(value, str) else repr(value)
+        if len(text) > self.max_chars:
+            return f"{text[: self.max_chars]}...({len(text)} chars)"
+        return text
+
+
+TRACE = Tracer()
@@ -0,0 +1,414 @@
+"""Pure forecast transform for nws_patch.
+
+Nothing in here touches Home Assistant at import time so the merge can be
+benchmarked and exercised without a Home Assistant install.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+import logging
+from types import MappingProxyType
+from typing import Optional, TypedDict, cast
+
+from .compat import (
+    ATTR_FORECAST_CONDITION,
+    ATTR_FORECAST_IS_DAYTIME,
+    ATTR_FORECAST_NATIVE_TEMP,
+    ATTR_FORECAST_NATIVE_TEMP_LOW,
+    ATTR_FORECAST_PRECIPITATION_PROBABILITY,
+    ATTR_FORECAST_TIME,
+    parse_datetime,
+)
+from .layout import DEFAULT_LAYOUT, DescriptionLayout
+from .trace import TRACE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class NWSForecast(TypedDict):
+    """Strong type for incoming NWS forecast data."""
+
+    detailed_description: str
+    datetime: str
+    daytime: bool
+    native_temperature: float
+
+
+class NewForecast(TypedDict):
+    """Strong type for outgoing modified NWS forecast data."""
+
+    detailed_description: str
+    datetime: str
+    native_temperature: float
+    native_templow: float
+
+
+class ForecastPeriod:
+    """Compact record of the parts of an NWS period the merge works with.
+
+    The original period is referenced rather than copied and is only turned
+    into a new mapping once the day it belongs to is merged.
+    """
+
+    __slots__ = ("source", "is_daytime", "temperature", "description")
+
+    def __init__(self, source: NWSForecast) -> None:
+        """Pull the merge inputs out of an NWS period."""
+        self.source = source
+        self.is_daytime = bool(source[ATTR_FORECAST_IS_DAYTIME])  # type: ignore[literal-required]
+        self.temperature = source[ATTR_FORECAST_NATIVE_TEMP]  # type: ignore[literal-required]
+        self.description = source["detailed_description"].strip()
+
+
+# evaluated at runtime, so Optional keeps this importable on Python 3.9
+PeriodStart = tuple[float, Optional[tzinfo]]
+
+
+def parse_period_start(value: str) -> PeriodStart | None:
+    """Parse an NWS period timestamp into its start, or None if it is invalid.
+
+    HA's parse_datetime already goes through ciso8601, which beats both
+    datetime.fromisoformat and any shape check done in Python, so it is used
+    as is; PERIOD_START_CACHE keeps this off the path for repeated timestamps.
+    """
+    parsed = parse_datetime(value)
+    return (parsed.timestamp(), parsed.tzinfo) if parsed else None
+
+
+class PeriodStartCache:
+    """Bounded LRU cache mapping NWS period timestamps to their parsed start.
+
+    Starts are kept as a POSIX timestamp along with the offset NWS sent, so
+    looking one up does not allocate.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        """Create an empty cache holding at most maxsize timestamps."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, PeriodStart | None] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached timestamps."""
+        return len(self._entries)
+
+    def get(self, value: str) -> PeriodStart | None:
+        """Return the start for value, or None if it does not parse."""
+        entries = self._entries
+        try:
+            start = entries[value]
+        except KeyError:
+            self.misses += 1
+            start = parse_period_start(value)
+            entries[value] = start
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+            return start
+
+        self.hits += 1
+        entries.move_to_end(value)
+        return start
+
+    def clear(self) -> None:
+        """Drop all cached timestamps and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class DayIndex:
+    """Find the local day of period starts by bisecting a table of midnights.
+
+    The table covers the forecast horizon from the day of the first period
+    looked up. Without a time zone the offset of that first period is used.
+    Days are returned as proleptic Gregorian ordinals.
+    """
+
+    __slots__ = ("time_zone", "first", "boundaries")
+
+    def __init__(self, time_zone: tzinfo | None = None) -> None:
+        """Create an index for time_zone, building the table on first use."""
+        self.time_zone = time_zone
+        self.first = 0
+        self.boundaries: tuple[float, ...] = ()
+
+    def day_of(self, start: PeriodStart) -> int:
+        """Return the ordinal of the local day start falls on."""
+        (timestamp, offset) = start
+        if not self.boundaries:
+            if self.time_zone is None:
+                self.time_zone = offset
+            local = datetime.fromtimestamp(timestamp, self.time_zone)
+            self.first = local.toordinal()
+            self.boundaries = _day_boundaries(self.time_zone, self.first)
+
+        index = bisect_right(self.boundaries, timestamp) - 1
+        if 0 <= index < len(self.boundaries) - 1:
+            return self.first + index
+
+        # outside the horizon, only reachable with unexpected input
+        return datetime.fromtimestamp(timestamp, self.time_zone).toordinal()
+
+
+# NWS forecasts cover at most seven and a half days
+_HORIZON_DAYS = 10
+
+
+@lru_cache(maxsize=8)
+def _day_boundaries(time_zone: tzinfo | None, first: int) -> tuple[float, ...]:
+    """Return the timestamps of local midnight for each day of the horizon."""
+
+    day = date.fromordinal(first)
+    return tuple(
+        datetime.combine(day + timedelta(days=offset), time(), time_zone).timestamp()
+        for offset in range(_HORIZON_DAYS + 1)
+    )
+
+
+# a lone night period reports its temperature as the low and drops the daytime flag
+_NIGHT_ONLY_DROPPED_KEYS = frozenset(
+    (ATTR_FORECAST_IS_DAYTIME, ATTR_FORECAST_NATIVE_TEMP)
+)
+
+# period timestamps repeat poll after poll, so parsing them is cached globally
+PERIOD_START_CACHE = PeriodStartCache()
+
+
+def clear_caches() -> None:
+    """Drop the cached period starts and day boundaries."""
+    PERIOD_START_CACHE.clear()
+    _day_boundaries.cache_clear()
+
+
+def forecast_fingerprint(periods: Iterable[NWSForecast]) -> int:
+    """Fingerprint every field of the periods.
+
+    The published forecast carries all upstream fields, wind and humidity
+    included, so all of them are covered. Periods with the same fields in a
+    different order only cost a rebuild.
+    """
+
+    periods = tuple(periods)
+    try:
+        return hash(tuple(tuple(item.items()) for item in periods))
+    except TypeError:
+        # a value that can not be hashed, fall back to its text
+        return hash(repr(periods))
+
+
+def build_forecast(
+    orig_forecast: list[NWSForecast],
+    time_zone: tzinfo | None = None,
+    layout: DescriptionLayout = DEFAULT_LAYOUT,
+) -> tuple[tuple[NewForecast, ...], str]:
+    """Merge day/night periods into days and build the detailed description.
+
+    Periods are grouped by their local day in time_zone, or in the offset NWS
+    sent when no time zone is given. The descriptions are laid out by layout.
+    """
+
+    try:
+        (forecast, tomorrow) = _merge_days(
+            _iter_days(orig_forecast, DayIndex(time_zone)), layout
+        )
+    except _PeriodsOutOfOrder:
+        # NWS sends periods sorted by start time, only sort when it didn't
+        _LOGGER.debug("forecast periods out of order, sorting")
+        starts = PERIOD_START_CACHE
+        ordered = sorted(
+            (item for item in orig_forecast if starts.get(item["datetime"])),
+            key=lambda item: cast(PeriodStart, starts.get(item["datetime"]))[0],
+        )
+        (forecast, tomorrow) = _merge_days(
+            _iter_days(ordered, DayIndex(time_zone)), layout
+        )
+
+    description = (layout.tonight if tomorrow else layout.today).render(
+        orig_forecast[0]["detailed_description"],
+        orig_forecast[1]["detailed_description"],
+    )
+
+    if TRACE.enabled:
+        TRACE.record("forecast.built", days=len(forecast), forecast=forecast)
+    return (tuple(forecast), description)
+
+
+def aggregate_hourly(
+    orig_forecast: list[NWSForecast],
+    time_zone: tzinfo | None = None,
+) -> tuple[NewForecast, ...]:
+    """Collapse an hourly forecast into a high, low and condition per local day.
+
+    The periods are split into columns once and each day is a slice found by
+    bisecting the start times, so the per day work is done by builtins.
+    """
+
+    starts = [PERIOD_START_CACHE.get(item["datetime"]) for item in orig_forecast]
+    periods = [
+        (start, item) for start, item in zip(starts, orig_forecast) if start
+    ]
+    if not periods:
+        return ()
+
+    if any(
+        later[0][0] < earlier[0][0] for earlier, later in zip(periods, periods[1:])
+    ):
+        periods.sort(key=lambda period: cast(PeriodStart, period[0])[0])
+
+    timestamps = [cast(PeriodStart, start)[0] for start, _ in periods]
+    items = [item for _, item in periods]
+
+    temperatures = [item.get(ATTR_FORECAST_NATIVE_TEMP) for item in items]
+    precipitation = [
+        item.get(ATTR_FORECAST_PRECIPITATION_PROBABILITY) for item in items
+    ]
+    conditions = [item.get(ATTR_FORECAST_CONDITION) for item in items]
+
+    days = DayIndex(time_zone)
+    first_day = days.day_of(cast(PeriodStart, periods[0][0]))
+    last_day = days.day_of(cast(PeriodStart, periods[-1][0]))
+
+    forecast: list[NewForecast] = []
+    low = 0
+    for day in range(first_day, last_day + 1):
+        if day + 1 - days.first < len(days.boundaries):
+            high = bisect_left(timestamps, days.boundaries[day + 1 - days.first], low)
+        else:
+            high = len(items)
+        if high == low:
+            continue
+
+        temps = [value for value in temperatures[low:high] if value is not None]
+        chances = [value for value in precipitation[low:high] if value is not None]
+        (condition, _) = Counter(conditions[low:high]).most_common(1)[0]
+
+        forecast.append(
+            cast(
+                NewForecast,
+                MappingProxyType(
+                    {
+                        ATTR_FORECAST_TIME: items[low]["datetime"],
+                        ATTR_FORECAST_CONDITION: condition,
+                        ATTR_FORECAST_NATIVE_TEMP: max(temps) if temps else None,
+                        ATTR_FORECAST_NATIVE_TEMP_LOW: min(temps) if temps else None,
+                        ATTR_FORECAST_PRECIPITATION_PROBABILITY: (
+                            max(chances) if chances else None
+                        ),
+                    }
+                ),
+            )
+        )
+        low = high
+
+    return tuple(forecast)
+
+
+class _PeriodsOutOfOrder(Exception):
+    """Raised when forecast periods are not sorted by start time."""
+
+
+def _iter_days(
+    periods: Iterable[NWSForecast], days: DayIndex
+) -> Iterator[tuple[int, list[ForecastPeriod]]]:
+    """Yield each day with its periods as soon as the next day starts.
+
+    Relies on the periods being sorted by start time, which NWS guarantees, so
+    only the current day is held. Raises _PeriodsOutOfOrder otherwise.
+    """
+
+    day: int | None = None
+    fcasts: list[ForecastPeriod] = []
+    for item in periods:
+        start = PERIOD_START_CACHE.get(item["datetime"])
+        if not start:
+            continue
+
+        date_ordinal = days.day_of(start)
+        if date_ordinal != day:
+            if day is not None:
+                if date_ordinal < day:
+                    raise _PeriodsOutOfOrder
+                yield (day, fcasts)
+            day = date_ordinal
+            fcasts = []
+
+        fcasts.append(ForecastPeriod(item))
+
+    if day is not None:
+        yield (day, fcasts)
+
+
+def _merge_days(
+    days: Iterable[tuple[int, list[ForecastPeriod]]],
+    layout: DescriptionLayout = DEFAULT_LAYOUT,
+) -> tuple[list[NewForecast], bool]:
+    """Merge each day's periods, noting if any day only had a single period."""
+
+    forecast: list[NewForecast] = []
+    tomorrow = False
+    for day, fcasts in days:
+        if TRACE.enabled:
+            TRACE.record("forecast.day", day=date.fromordinal(day), periods=len(fcasts))
+        if len(fcasts) == 1:
+            tomorrow = True
+            forecast.append(_convert_single_fcast(fcasts, layout))
+        else:
+            new_fcast = _merge_fcasts(fcasts, layout)
+            if new_fcast:
+                forecast.append(new_fcast)
+            else:
+                _LOGGER.warning(
+                    "Day %s is unable to merge multiple forecasts: %s",
+                    date.fromordinal(day),
+                    [fcast.source for fcast in fcasts],
+                )
+
+    return (forecast, tomorrow)
+
+
+def _merge_fcasts(
+    fcasts: list[ForecastPeriod], layout: DescriptionLayout = DEFAULT_LAYOUT
+) -> NewForecast | None:
+    daycast = next((f for f in fcasts if f.is_daytime), None)
+    nightcast = next((f for f in fcasts if not f.is_daytime), None)
+    if daycast is None or nightcast is None:
+        return None
+
+    merged = dict(daycast.source)
+    merged["detailed_description"] = layout.merged.render(
+        daycast.description, nightcast.description
+    )
+    merged[ATTR_FORECAST_NATIVE_TEMP_LOW] = nightcast.temperature
+
+    return cast(NewForecast, MappingProxyType(merged))
+
+
+def _convert_single_fcast(
+    fcasts: list[ForecastPeriod], layout: DescriptionLayout = DEFAULT_LAYOUT
+) -> NewForecast:
+    fcast = fcasts[0]
+
+    if fcast.is_daytime:
+        template = layout.day
+        new_cast = {
+            key: value
+            for key, value in fcast.source.items()
+            if key != ATTR_FORECAST_IS_DAYTIME
+        }
+    else:
+        template = layout.night
+        new_cast = {
+            key: value
+            for key, value in fcast.source.items()
+            if key not in _NIGHT_ONLY_DROPPED_KEYS
+        }
+        new_cast[ATTR_FORECAST_NATIVE_TEMP_LOW] = fcast.temperature
+
+    new_cast["detailed_description"] = template.render(fcast.description)
+
+    return cast(NewForecast, MappingProxyType(new_cast))
@@ -0,0 +1,153 @@
+"""Tests for the weakly keyed per-entity cache."""
+from __future__ import annotations
+
+import gc
+
+from benchmarks import payloads
+from custom_components.nws_patch import ForecastMemo
+from custom_components.nws_patch.cache import EntityCache, EntityState, estimate_size
+
+
+class Entity:
+    """Stand-in for an NWS entity, only ever referenced weakly."""
+
+
+def _forecast(periods: int = 14) -> tuple:
+    return tuple(payloads.twice_daily(True, periods))
+
+
+def _shown(state: EntityState, forecast: tuple, text: str = "") -> None:
+    state.memo = ForecastMemo("daynight", None, 0, forecast)
+    state.publish(forecast, text, False)
+
+
+def test_estimate_size() -> None:
+    forecast = _forecast(2)
+
+    assert estimate_size(()) == 0
+    assert estimate_size(forecast) == sum(
+        250 + len(item["detailed_description"]) for item in forecast
+    )
+
+
+def test_get_creates_state_once() -> None:
+    cache = EntityCache()
+    entity = Entity()
+
+    assert cache.peek(entity) is None
+    state = cache.get(entity)
+
+    assert cache.get(entity) is state
+    assert cache.peek(entity) is state
+    assert len(cache) == 1
+
+
+def test_entry_removed_when_entity_is_collected() -> None:
+    cache = EntityCache()
+    (kept, dropped) = (Entity(), Entity())
+    for entity in (kept, dropped):
+        state = cache.get(entity)
+        _shown(state, _forecast(), "text")
+        cache.account(state)
+    kept_bytes = cache.peek(kept).nbytes
+
+    del entity, dropped
+    gc.collect()
+
+    assert len(cache) == 1
+    assert [entity for entity, _ in cache.items()] == [kept]
+    assert cache.nbytes == kept_bytes
+
+
+def test_shared_forecast_counted_once() -> None:
+    cache = EntityCache()
+    state = cache.get(Entity())
+    forecast = _forecast()
+
+    _shown(state, forecast, "text")
+    state.twice_daily_memo = ForecastMemo("daynight", None, 0, forecast)
+    cache.account(state)
+
+    assert state.nbytes == estimate_size(forecast) + len("text")
+    assert cache.nbytes == state.nbytes
+
+
+def test_budget_evicts_least_recently_used_hidden_forecast() -> None:
+    size = estimate_size(_forecast())
+    cache = EntityCache(budget=6 * size + size // 2)
+    entities = [Entity() for _ in range(3)]
+    states = [cache.get(entity) for entity in entities]
+    for state in states:
+        _shown(state, _forecast())
+        state.twice_daily_memo = ForecastMemo("daynight", None, 0, _forecast())
+        cache.account(state)
+    assert cache.evictions == 0
+
+    # using the first entity again leaves the second least recently used
+    cache.get(entities[0])
+    states[2].twice_daily_memo = ForecastMemo("daynight", None, 0, _forecast(28))
+    cache.account(states[2])
+
+    assert [state.twice_daily_memo is None for state in states] == [
+        False,
+        True,
+        False,
+    ]
+    assert all(state.memo is not None for state in states)
+    assert cache.evictions == 1
+    assert cache.nbytes == sum(state.measure() for state in states)
+    assert cache.nbytes <= cache.budget
+
+
+def test_shown_forecast_is_never_evicted() -> None:
+    cache = EntityCache(budget=1)
+    entities = [Entity(), Entity()]
+    states = [cache.get(entity) for entity in entities]
+    for state in states:
+        _shown(state, _forecast())
+        cache.account(state)
+
+    assert all(state.memo is not None for state in states)
+    assert cache.evictions == 0
+    assert cache.nbytes == sum(state.measure() for state in states)
+
+
+def test_invalidate_drops_every_memo() -> None:
+    cache = EntityCache()
+    entity = Entity()
+    state = cache.get(entity)
+    forecast = _forecast()
+    _shown(state, forecast, "text")
+    state.twice_daily_memo = ForecastMemo("daynight", None, 0, _forecast())
+    cache.account(state)
+
+    cache.invalidate()
+
+    assert state.memo is None and state.twice_daily_memo is None
+    assert state.snapshot.forecast is forecast
+    assert cache.nbytes == state.nbytes == estimate_size(forecast) + len("text")
+
+
+def test_publish_replaces_snapshot() -> None:
+    state = EntityState()
+
+    first = state.publish((), "first", False)
+    previous = state.publish((), "second", True)
+
+    assert first.version == 0
+    assert previous.detailed_forecast == "first"
+    assert (state.snapshot.detailed_forecast, state.snapshot.version) == ("second", 2)
+    assert state.snapshot.stale
+
+
+def test_clear() -> None:
+    cache = EntityCache()
+    entity = Entity()
+    state = cache.get(entity)
+    _shown(state, _forecast())
+    cache.account(state)
+
+    cache.clear()
+
+    assert (len(cache), cache.nbytes) == (0, 0)
+    assert cache.peek(entity) is None
@@ -0,0 +1,61 @@
+"""Tests for the bounded profile windows."""
+from __future__ import annotations
+
+import asyncio
+import pstats
+
+import pytest
+
+from custom_components.nws_patch.profiler import ProfileWindow
+
+
+def _leaf() -> int:
+    return 1
+
+
+def test_idle_window_only_calls() -> None:
+    window = ProfileWindow()
+
+    assert window.run(_leaf) == 1
+    assert (window.active, window.profiled) == (False, 0)
+    assert window.stop() is None
+
+
+def test_window_profiles_outermost_calls() -> None:
+    async def profile() -> None:
+        window = ProfileWindow()
+        done = window.start(2)
+
+        def outer() -> int:
+            return window.run(_leaf) + 1
+
+        assert window.run(outer) == 2
+        assert not done.is_set()
+        assert window.run(outer) == 2
+        assert done.is_set()
+
+        # the window is used up, so further calls are not profiled
+        window.run(outer)
+        assert (window.profiled, window.remaining) == (2, 0)
+
+        profile = window.stop()
+        assert profile is not None and not window.active
+        functions = {name for (_, _, name) in pstats.Stats(profile).stats}
+        assert {"outer", "_leaf"} <= functions
+
+    asyncio.run(profile())
+
+
+def test_start_while_active_raises() -> None:
+    async def profile() -> None:
+        window = ProfileWindow()
+        window.start(1)
+        with pytest.raises(RuntimeError):
+            window.start(1)
+
+        done = window._done  # pylint: disable=protected-access
+        assert window.stop() is None
+        assert done is not None and done.is_set()
+        window.start(1)
+
+    asyncio.run(profile())
@@ -0,0 +1,71 @@
+"""Tests for the call timings shown in the diagnostics."""
+from __future__ import annotations
+
+from custom_components.nws_patch.stats import CallTimings, EntityStats
+
+
+def test_empty_timings() -> None:
+    timings = CallTimings()
+
+    assert timings.percentile(0.5) is None
+    assert timings.as_dict() == {
+        "calls": 0,
+        "stalls": 0,
+        "p50_ms": None,
+        "p99_ms": None,
+        "histogram": dict.fromkeys(
+            ["<=1ms", "<=2ms", "<=5ms", "<=10ms", "<=25ms", "<=50ms"]
+            + ["<=100ms", "<=250ms", ">250ms"],
+            0,
+        ),
+    }
+
+
+def test_percentiles() -> None:
+    timings = CallTimings()
+    for milliseconds in range(1, 101):
+        timings.record(milliseconds / 1000)
+
+    assert timings.percentile(0.5) == 0.051
+    assert timings.percentile(0.99) == 0.1
+    assert timings.percentile(1) == 0.1
+    result = timings.as_dict()
+    assert (result["calls"], result["p50_ms"], result["p99_ms"]) == (100, 51, 100)
+
+
+def test_histogram_buckets_include_upper_bound() -> None:
+    timings = CallTimings()
+    for seconds in (0.0005, 0.001, 0.0011, 0.05, 0.3):
+        timings.record(seconds)
+
+    histogram = timings.histogram()
+
+    assert histogram["<=1ms"] == 2
+    assert histogram["<=2ms"] == 1
+    assert histogram["<=50ms"] == 1
+    assert histogram[">250ms"] == 1
+    assert sum(histogram.values()) == 5
+
+
+def test_window_keeps_latest_samples() -> None:
+    timings = CallTimings(size=3)
+    for seconds in (1.0, 1.0, 0.001, 0.001, 0.001):
+        timings.record(seconds)
+
+    assert timings.calls == 5
+    assert timings.percentile(0.99) == 0.001
+    assert sum(timings.histogram().values()) == 3
+
+
+def test_entity_stats_as_dict() -> None:
+    stats = EntityStats()
+    stats.write_state.record(0.002)
+    stats.write_state.stalls += 1
+    stats.cache_hits = 3
+
+    result = stats.as_dict()
+
+    assert result["async_write_ha_state"]["calls"] == 1
+    assert result["async_write_ha_state"]["stalls"] == 1
+    assert result["daily_forecast"]["calls"] == 0
+    assert (result["cache_hits"], result["cache_misses"]) == (3, 0)
@@ -0,0 +1,128 @@
+"""Tests for the forecasts kept across restarts."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import sys
+from types import MappingProxyType, ModuleType
+from typing import Any
+
+import pytest
+
+from custom_components.nws_patch.store import SAVE_DELAY, STORAGE_KEY, ForecastStore
+
+STORAGE_MODULE = "homeassistant.helpers.storage"
+
+
+class MemoryStore:
+    """Stand-in for Home Assistant's Store, saving into the dict passed as hass."""
+
+    def __init__(self, hass: dict[str, Any], version: int, key: str) -> None:
+        del version
+        self.saved = hass
+        self.key = key
+        self.pending: Callable[[], Any] | None = None
+        self.delay: float | None = None
+
+    async def async_load(self) -> Any:
+        return self.saved.get(self.key)
+
+    def async_delay_save(self, data_func: Callable[[], Any], delay: float) -> None:
+        self.pending = data_func
+        self.delay = delay
+
+    def flush(self) -> None:
+        assert self.pending is not None
+        self.saved[self.key] = self.pending()
+        self.pending = None
+
+    async def async_remove(self) -> None:
+        self.saved.pop(self.key, None)
+        self.pending = None
+
+
+@pytest.fixture(name="saved")
+def fixture_saved(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    """Have ForecastStore save into the returned dict."""
+
+    try:
+        from homeassistant.helpers import (  # pylint: disable=import-outside-toplevel
+            storage,
+        )
+    except ImportError:
+        storage = ModuleType(STORAGE_MODULE)
+        for name in ("homeassistant", "homeassistant.helpers"):
+            monkeypatch.setitem(sys.modules, name, ModuleType(name))
+        monkeypatch.setitem(sys.modules, STORAGE_MODULE, storage)
+    monkeypatch.setattr(storage, "Store", MemoryStore, raising=False)
+    return {}
+
+
+def _stored(text: str = "text") -> dict[str, Any]:
+    return {
+        "mode": "daynight",
+        "hourly_forecast": "hourly",
+        "forecast": [
+            {"datetime": "2022-12-05T06:00:00-06:00", "detailed_description": text}
+        ],
+        "detailed_forecast": text,
+        "updated": "2022-12-05T12:00:00+00:00",
+    }
+
+
+def _load(saved: dict[str, Any]) -> ForecastStore:
+    store = ForecastStore(saved)  # type: ignore[arg-type]
+    asyncio.run(store.async_load())
+    return store
+
+
+def test_load_saved_forecasts(saved: dict[str, Any]) -> None:
+    saved[STORAGE_KEY] = {"abc:daynight": _stored(), "broken:daynight": {"mode": "x"}}
+
+    store = _load(saved)
+
+    stored = store.get("abc:daynight")
+    assert stored is not None
+    assert (stored.mode, stored.detailed_forecast) == ("daynight", "text")
+    assert isinstance(stored.forecast[0], MappingProxyType)
+    assert store.get("broken:daynight") is None
+    assert store.get("missing:daynight") is None
+
+
+def test_load_without_saved_forecasts(saved: dict[str, Any]) -> None:
+    assert _load(saved).get("abc:daynight") is None
+
+
+def test_update_is_read_back_and_saved(saved: dict[str, Any]) -> None:
+    saved[STORAGE_KEY] = {"abc:daynight": _stored("old")}
+    store = _load(saved)
+    forecast = (MappingProxyType({"datetime": "2022-12-06T06:00:00-06:00"}),)
+
+    store.async_update("abc:daynight", "daynight", "daily", forecast, "new")
+
+    stored = store.get("abc:daynight")
+    assert stored is not None
+    assert (stored.hourly_forecast, stored.forecast, stored.detailed_forecast) == (
+        "daily",
+        forecast,
+        "new",
+    )
+
+    # pylint: disable-next=protected-access
+    backend: MemoryStore = store._store  # type: ignore[assignment]
+    assert backend.delay == SAVE_DELAY
+    backend.flush()
+    assert saved[STORAGE_KEY]["abc:daynight"]["forecast"] == [
+        {"datetime": "2022-12-06T06:00:00-06:00"}
+    ]
+    assert type(saved[STORAGE_KEY]["abc:daynight"]["forecast"][0]) is dict
+
+
+def test_remove(saved: dict[str, Any]) -> None:
+    saved[STORAGE_KEY] = {"abc:daynight": _stored()}
+    store = _load(saved)
+
+    asyncio.run(store.async_remove())
+
+    assert store.get("abc:daynight") is None
+    assert STORAGE_KEY not in saved
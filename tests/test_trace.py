@@ -0,0 +1,53 @@
+"""Tests for the sampled trace records."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from custom_components.nws_patch.trace import Tracer
+
+LOGGER = "custom_components.nws_patch.trace"
+
+
+def test_configure_clamps_sample_rate() -> None:
+    tracer = Tracer()
+    assert not tracer.enabled
+
+    tracer.configure(2.0, 10)
+    assert (tracer.enabled, tracer.sample_rate, tracer.max_chars) == (True, 1.0, 10)
+
+    tracer.configure(-1.0)
+    assert (tracer.enabled, tracer.sample_rate) == (False, 0.0)
+
+
+def test_record_logs_truncated_fields(caplog: pytest.LogCaptureFixture) -> None:
+    tracer = Tracer()
+    tracer.configure(1.0, 5)
+
+    with caplog.at_level(logging.DEBUG, logger=LOGGER):
+        tracer.record("forecast.built", days=7, text="abcdefgh")
+
+    assert caplog.messages == ["forecast.built days=7 text=abcde...(8 chars)"]
+
+
+def test_record_needs_debug_logging(caplog: pytest.LogCaptureFixture) -> None:
+    tracer = Tracer()
+    tracer.configure(1.0)
+
+    with caplog.at_level(logging.INFO, logger=LOGGER):
+        tracer.record("forecast.built", days=7)
+
+    assert not caplog.records
+
+
+def test_record_samples(caplog: pytest.LogCaptureFixture) -> None:
+    tracer = Tracer()
+    tracer.configure(0.5)
+    tracer._random.seed(1)  # pylint: disable=protected-access
+
+    with caplog.at_level(logging.DEBUG, logger=LOGGER):
+        for _ in range(1000):
+            tracer.record("forecast.day")
+
+    assert 400 < len(caplog.records) < 600
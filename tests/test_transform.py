@@ -0,0 +1,289 @@
+"""Tests for the Home Assistant free forecast transform."""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+import random
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from benchmarks import payloads
+from custom_components.nws_patch.layout import DescriptionLayout, Template
+from custom_components.nws_patch.transform import (
+    DayIndex,
+    PeriodStartCache,
+    aggregate_hourly,
+    build_forecast,
+    parse_period_start,
+)
+
+CHICAGO = ZoneInfo("America/Chicago")
+
+
+def _old_merge(orig_forecast: list[dict[str, Any]]) -> tuple[list[dict], str]:
+    """Merge the periods the way the patch did before the transform was split out."""
+
+    bucket: dict[datetime, list[dict[str, Any]]] = defaultdict(list)
+    for item in orig_forecast:
+        start = datetime.fromisoformat(item["datetime"])
+        bucket[start.replace(hour=0, minute=0, second=0, microsecond=0)].append(item)
+
+    forecast = []
+    tomorrow = False
+    for fcasts in bucket.values():
+        if len(fcasts) == 1:
+            tomorrow = True
+            new_cast = {**fcasts[0]}
+            title = "Day"
+            if not new_cast["is_daytime"]:
+                title = "Night"
+                new_cast["native_templow"] = new_cast.pop("native_temperature")
+            new_cast["detailed_description"] = (
+                f"### {title}\n" + new_cast["detailed_description"].strip()
+            )
+            del new_cast["is_daytime"]
+            forecast.append(new_cast)
+            continue
+
+        daycast = next(f for f in fcasts if f["is_daytime"])
+        nightcast = next(f for f in fcasts if not f["is_daytime"])
+        merged = {**daycast}
+        merged["detailed_description"] = (
+            "### Day\n"
+            + daycast["detailed_description"].strip()
+            + "\n\n### Night\n"
+            + nightcast["detailed_description"].strip()
+        )
+        merged["native_templow"] = nightcast["native_temperature"]
+        forecast.append(merged)
+
+    (first, second) = ("Tonight", "Tomorrow") if tomorrow else ("Today", "Tonight")
+    description = (
+        f"### {first}\n{orig_forecast[0]['detailed_description']}\n"
+        f"### {second}\n{orig_forecast[1]['detailed_description']}"
+    )
+    return (forecast, description)
+
+
+def _period(when: str, daytime: bool, temp: float = 50) -> dict[str, Any]:
+    return {
+        "detailed_description": f"Period at {when}. ",
+        "datetime": when,
+        "is_daytime": daytime,
+        "native_temperature": temp,
+    }
+
+
+@pytest.mark.parametrize("start_daytime", [True, False])
+@pytest.mark.parametrize("periods", [2, 3, 13, 14])
+def test_build_forecast_matches_old_merge(start_daytime: bool, periods: int) -> None:
+    orig_forecast = payloads.twice_daily(start_daytime, periods)
+
+    (forecast, description) = build_forecast(orig_forecast)
+
+    assert ([dict(item) for item in forecast], description) == _old_merge(
+        orig_forecast
+    )
+
+
+def test_build_forecast_sorts_periods_out_of_order() -> None:
+    orig_forecast = payloads.twice_daily(False)
+    shuffled = orig_forecast[:2] + random.Random(3).sample(
+        orig_forecast[2:], len(orig_forecast) - 2
+    )
+
+    assert build_forecast(shuffled) == build_forecast(orig_forecast)
+
+
+def test_build_forecast_skips_invalid_periods() -> None:
+    orig_forecast = payloads.twice_daily()
+    broken = [*orig_forecast, _period("not a date", True)]
+
+    assert build_forecast(broken) == build_forecast(orig_forecast)
+
+
+def test_build_forecast_uses_layout() -> None:
+    layout = DescriptionLayout(
+        merged="{day} / {night}",
+        today="{first} | {second}",
+    )
+    orig_forecast = payloads.twice_daily(True, 2)
+
+    (forecast, description) = build_forecast(orig_forecast, layout=layout)
+
+    (day, night) = orig_forecast
+    assert forecast[0]["detailed_description"] == (
+        f"{day['detailed_description'].strip()} / "
+        f"{night['detailed_description'].strip()}"
+    )
+    assert description == (
+        f"{day['detailed_description']} | {night['detailed_description']}"
+    )
+
+
+def test_build_forecast_buckets_by_time_zone() -> None:
+    # 23:00 in Chicago is already the next day in UTC
+    orig_forecast = [
+        _period("2022-12-05T06:00:00-06:00", True, 60),
+        _period("2022-12-05T23:00:00-06:00", False, 40),
+    ]
+
+    (local, _) = build_forecast(orig_forecast, CHICAGO)
+    (utc, _) = build_forecast(orig_forecast, timezone.utc)
+
+    assert [item["native_templow"] for item in local] == [40]
+    assert [item.get("native_templow") for item in utc] == [None, 40]
+
+
+def test_day_index_across_dst_change() -> None:
+    # Chicago falls back from CDT to CST on 2022-11-06, a 25 hour day
+    days = DayIndex(CHICAGO)
+    nov_5 = date(2022, 11, 5).toordinal()
+
+    def day_of(value: str) -> int:
+        start = parse_period_start(value)
+        assert start is not None
+        return days.day_of(start)
+
+    assert day_of("2022-11-05T18:00:00-05:00") == nov_5
+    assert day_of("2022-11-06T00:00:00-05:00") == nov_5 + 1
+    assert day_of("2022-11-06T01:30:00-06:00") == nov_5 + 1
+    assert day_of("2022-11-06T23:59:00-06:00") == nov_5 + 1
+    assert day_of("2022-11-07T00:00:00-06:00") == nov_5 + 2
+    assert days.boundaries[2] - days.boundaries[1] == 25 * 3600
+
+
+def test_day_index_without_time_zone_uses_first_offset() -> None:
+    days = DayIndex()
+    start = parse_period_start("2022-12-05T23:00:00-06:00")
+    assert start is not None
+
+    assert days.day_of(start) == date(2022, 12, 5).toordinal()
+    assert days.time_zone == timezone(timedelta(hours=-6))
+
+
+def test_day_index_outside_horizon() -> None:
+    days = DayIndex(timezone.utc)
+    first = parse_period_start("2022-12-05T12:00:00+00:00")
+    later = parse_period_start("2023-01-05T12:00:00+00:00")
+    assert first is not None and later is not None
+
+    assert days.day_of(first) == date(2022, 12, 5).toordinal()
+    assert days.day_of(later) == date(2023, 1, 5).toordinal()
+
+
+def test_aggregate_hourly() -> None:
+    orig_forecast = payloads.hourly()
+
+    forecast = aggregate_hourly(orig_forecast)
+
+    # the first and last days are partial, starting at 06:00 and ending at 17:00
+    assert len(forecast) == 7
+    first_day = orig_forecast[:18]
+    temps = [item["native_temperature"] for item in first_day]
+    conditions = [item["condition"] for item in first_day]
+    assert dict(forecast[0]) == {
+        "datetime": first_day[0]["datetime"],
+        "condition": max(conditions, key=conditions.count),
+        "native_temperature": max(temps),
+        "native_templow": min(temps),
+        "precipitation_probability": max(
+            item["precipitation_probability"] for item in first_day
+        ),
+    }
+    assert forecast[1]["datetime"] == orig_forecast[18]["datetime"]
+
+
+def test_aggregate_hourly_out_of_order() -> None:
+    orig_forecast = payloads.hourly()
+    shuffled = random.Random(7).sample(orig_forecast, len(orig_forecast))
+
+    assert aggregate_hourly(shuffled) == aggregate_hourly(orig_forecast)
+
+
+def test_aggregate_hourly_by_time_zone() -> None:
+    forecast = aggregate_hourly(payloads.hourly(), timezone.utc)
+
+    # 06:00 at -06:00 is noon UTC, so the last day ends at 23:00 UTC
+    assert len(forecast) == 7
+    assert forecast[1]["datetime"] == payloads.hourly()[12]["datetime"]
+
+
+def test_aggregate_hourly_without_valid_periods() -> None:
+    assert aggregate_hourly([_period("not a date", True)]) == ()
+
+
+def test_template_render() -> None:
+    one = Template("### Day\n{description}", ("description",))
+    two = Template("{first} and {second}!", ("first", "second"))
+    three = Template("<{a}|{b}|{c}>", ("a", "b", "c"))
+
+    assert one.render("Sunny.") == "### Day\nSunny."
+    assert two.render("rain", "snow") == "rain and snow!"
+    assert three.render("1", "2", "3") == "<1|2|3>"
+    assert repr(one) == "Template('### Day\\n{description}')"
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{night} {day}",
+        "{day}",
+        "{day} {night} {day}",
+        "{day!r} {night}",
+        "{day:>10} {night}",
+    ],
+)
+def test_template_rejects_wrong_fields(source: str) -> None:
+    with pytest.raises(ValueError):
+        Template(source, ("day", "night"))
+
+
+def test_description_layout_defaults() -> None:
+    layout = DescriptionLayout()
+
+    assert layout.merged.render("a", "b") == "### Day\na\n\n### Night\nb"
+    assert layout.day.render("a") == "### Day\na"
+    assert layout.night.render("a") == "### Night\na"
+    assert layout.today.render("a", "b") == "### Today\na\n### Tonight\nb"
+    assert layout.tonight.render("a", "b") == "### Tonight\na\n### Tomorrow\nb"
+
+
+def test_description_layout_rejects_wrong_fields() -> None:
+    with pytest.raises(ValueError):
+        DescriptionLayout(night="{day}")
+
+
+def test_period_start_cache_evicts_least_recently_used() -> None:
+    cache = PeriodStartCache(maxsize=2)
+    (first, second, third) = (
+        "2022-12-05T06:00:00-06:00",
+        "2022-12-05T18:00:00-06:00",
+        "2022-12-06T06:00:00-06:00",
+    )
+
+    assert cache.get(first) == parse_period_start(first)
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # second was used least recently, so it was the one dropped
+    cache.get(first)
+    cache.get(second)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_period_start_cache_keeps_invalid_values() -> None:
+    cache = PeriodStartCache()
+
+    assert cache.get("not a date") is None
+    assert cache.get("not a date") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)